@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 import os
 import time
 from typing import List, Optional, Dict, Any
@@ -12,6 +13,18 @@ from fastapi.responses import RedirectResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field, ConfigDict, field_validator
 
+# Optional int8 dot-product kernels for quantized label scoring (see LABEL_INT8)
+try:
+    import simsimd
+except Exception:
+    simsimd = None  # type: ignore[assignment]
+
+# Optional JIT for the masked best-child argmax; NumPy path otherwise
+try:
+    from numba import njit
+except Exception:
+    njit = None  # type: ignore[assignment]
+
 from backend.src.models import Embedder
 from backend.src.analysis import (
     load_taxonomy_hier,
@@ -19,7 +32,10 @@ from backend.src.analysis import (
 )
 from backend.src.recommend import recommend_piece, SEARCH_PROVIDER as R_PROVIDER, SERPAPI_KEY as R_KEY
 from backend.src.recommend import ALLOWLIST as R_ALLOWLIST
-from backend.src.sql_recommend import recommend_from_db as sql_recommend, db_ready_info
+from backend.src.sql_recommend import (
+    recommend_from_db_async as sql_recommend_async,
+    db_ready_info_async,
+)
 
 
 # ---------- Config ----------
@@ -40,6 +56,8 @@ PROFILE_PATH = os.getenv("PROFILE_PATH", "backend/data/profile.json")
 # Scoring defaults
 ALPHA_DEFAULT = float(os.getenv("ALPHA", "0.30"))
 TOPK_PARENT_DEFAULT = int(os.getenv("TOPK_PARENT", "8"))
+# Score titles against int8-quantized label embeddings (needs simsimd; small score drift vs float32)
+LABEL_INT8 = os.getenv("LABEL_INT8", "0").lower() in {"1", "true", "yes"}
 
 
 # ---------- App ----------
@@ -129,10 +147,73 @@ _PARENTS: list[dict] | None = None
 _CHILDREN: list[dict] | None = None
 _P_EMB: np.ndarray | None = None
 _C_EMB: np.ndarray | None = None
+# C-contiguous float32 transposes so the title x label matmuls dispatch straight to sgemm
+_P_EMB_T: np.ndarray | None = None
+_C_EMB_T: np.ndarray | None = None
+_CHILD_PIDX: np.ndarray | None = None
+_CHILDREN_META: tuple[tuple[str, str], ...] = ()
+# int8 label matrices + per-row scales, only built when LABEL_INT8 is on and simsimd is importable
+_P_EMB_Q: np.ndarray | None = None
+_P_SCALE: np.ndarray | None = None
+_C_EMB_Q: np.ndarray | None = None
+_C_SCALE: np.ndarray | None = None
+
+
+def _quantize_rows(X: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Symmetric per-row int8 quantization: X ≈ X_q / scale[:, None]."""
+    amax = np.abs(X).max(axis=1) if X.size else np.zeros(X.shape[0], dtype=np.float32)
+    scale = (127.0 / np.maximum(amax, 1e-12)).astype(np.float32)
+    return np.round(X * scale[:, None]).astype(np.int8), scale
+
+
+def _label_scores(
+    V: np.ndarray,
+    V_q: np.ndarray | None,
+    V_scale: np.ndarray | None,
+    emb_t: np.ndarray,
+    emb_q: np.ndarray | None,
+    emb_scale: np.ndarray | None,
+) -> np.ndarray:
+    """Cosine scores [N, L] of titles vs labels; int8 path when both sides are quantized."""
+    if V_q is not None and emb_q is not None and V_scale is not None and emb_scale is not None:
+        dots = np.asarray(simsimd.cdist(V_q, emb_q, metric="dot"), dtype=np.float32)
+        return dots / (V_scale[:, None] * emb_scale[None, :])
+    return V @ emb_t
+
+
+if njit is not None:
+    # Serial on purpose: /analyze runs in FastAPI's threadpool, and a parallel kernel called from several
+    # threads at once can abort the process under Numba's (non-threadsafe) workqueue threading layer
+    @njit(cache=True)
+    def _masked_best_child(combined, mask, out_best, out_has):
+        # Masked argmax per row; first maximum wins, matching np.argmax
+        n, c = combined.shape
+        for i in range(n):
+            bj = -1
+            bs = -np.inf
+            for j in range(c):
+                if mask[i, j] and combined[i, j] > bs:
+                    bs = combined[i, j]
+                    bj = j
+            out_has[i] = bj >= 0
+            out_best[i] = bj if bj >= 0 else 0
+else:
+    _masked_best_child = None
+
+
+def _pick_best_child(combined: np.ndarray, mask: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Best allowed child per row, and whether the row had any allowed child."""
+    if _masked_best_child is not None:
+        best = np.empty(combined.shape[0], dtype=np.int64)
+        has_child = np.empty(combined.shape[0], dtype=np.bool_)
+        _masked_best_child(combined, mask, best, has_child)
+        return best, has_child
+    return np.where(mask, combined, -np.inf).argmax(axis=1), mask.any(axis=1)
 
 
 def _ensure_ready():
-    global _EMBEDDER, _PARENTS, _CHILDREN, _P_EMB, _C_EMB
+    global _EMBEDDER, _PARENTS, _CHILDREN, _P_EMB, _C_EMB, _P_EMB_T, _C_EMB_T, _CHILD_PIDX, _CHILDREN_META
+    global _P_EMB_Q, _P_SCALE, _C_EMB_Q, _C_SCALE
     if _EMBEDDER is None:
         _EMBEDDER = Embedder(MODEL_KEY)
     if _PARENTS is None or _P_EMB is None:
@@ -146,7 +227,25 @@ def _ensure_ready():
             parents=parents,
             children=children,
         )
+        p_emb = np.ascontiguousarray(p_emb, dtype=np.float32)
+        if c_emb is not None:
+            c_emb = np.ascontiguousarray(c_emb, dtype=np.float32)
         _PARENTS, _CHILDREN, _P_EMB, _C_EMB = p, c, p_emb, c_emb
+        _P_EMB_T = np.ascontiguousarray(p_emb.T)
+        _C_EMB_T = np.ascontiguousarray(c_emb.T) if c_emb is not None else None
+        # Per-child parent index and (parent, child) names, reused by every /analyze call
+        _CHILD_PIDX = np.array([ch["p_index"] for ch in (c or [])], dtype=np.int64)
+        _CHILDREN_META = tuple((ch["p_en"], ch["en"]) for ch in (c or []))
+        if LABEL_INT8:
+            if simsimd is None:
+                logger.warning("LABEL_INT8=1 but simsimd is not installed; using float32 label scores")
+            else:
+                _P_EMB_Q, _P_SCALE = _quantize_rows(p_emb)
+                if c_emb is not None and c_emb.shape[0] > 0:
+                    _C_EMB_Q, _C_SCALE = _quantize_rows(c_emb)
+        if _masked_best_child is not None:
+            # Compile the kernel now rather than on the first /analyze call
+            _pick_best_child(np.zeros((1, 1), dtype=np.float32), np.ones((1, 1), dtype=bool))
 
 
 @app.get("/healthz")
@@ -155,12 +254,15 @@ def healthz():
 
 
 @app.get("/readyz")
-def readyz():
+async def readyz():
     try:
-        _ensure_ready()
+        # First call loads the embedder and label bank; keep that off the event loop
+        await asyncio.to_thread(_ensure_ready)
         sql = {}
         try:
-            sql = db_ready_info()
+            # Same async pool /recommend uses, so readiness reflects the pool that serves traffic
+            # (and no sync pool is opened just for probes)
+            sql = await db_ready_info_async()
         except Exception as e:
             sql = {"ok": False, "error": str(e)}
         return {
@@ -194,67 +296,68 @@ def favicon():
 @app.post("/analyze", response_model=AnalyzeResponse)
 def analyze(req: AnalyzeRequest):
     _ensure_ready()
-    assert _EMBEDDER is not None and _PARENTS is not None and _P_EMB is not None
+    assert _EMBEDDER is not None and _PARENTS is not None and _P_EMB is not None and _P_EMB_T is not None
 
     titles = req.titles
     alpha = req.options.alpha if req.options and req.options.alpha is not None else ALPHA_DEFAULT
     topk_parent = req.options.topk_parent if req.options else TOPK_PARENT_DEFAULT
 
     # Prepare title inputs (no E5 query/passage prefixes since we use MiniLM)
-    V = _EMBEDDER.encode(titles)
-    P = _P_EMB
-    p_scores = V @ P.T  # [N, P]
+    V = np.ascontiguousarray(_EMBEDDER.encode(titles), dtype=np.float32)
+    V_q = V_scale = None
+    if _P_EMB_Q is not None:
+        V_q, V_scale = _quantize_rows(V)
+    p_scores = _label_scores(V, V_q, V_scale, _P_EMB_T, _P_EMB_Q, _P_SCALE)  # [N, P]
 
     # If we have T1 children, compute joint scoring; else fallback to T0 only
     if _CHILDREN is not None and len(_CHILDREN) > 0 and _C_EMB is not None and _C_EMB.shape[0] > 0:
-        C = _C_EMB
-        child_pidx = np.array([c["p_index"] for c in _CHILDREN], dtype=np.int64)
+        child_pidx = _CHILD_PIDX
+        assert child_pidx is not None and _C_EMB_T is not None
 
         # Optionally mask to top-k parents
         mask = None
         if topk_parent is not None and 0 < topk_parent < len(_PARENTS):
             topP = np.argpartition(-p_scores, kth=topk_parent - 1, axis=1)[:, :topk_parent]
-            mask = np.zeros((V.shape[0], len(_CHILDREN)), dtype=bool)
-            for n in range(V.shape[0]):
-                allowed = set(topP[n].tolist())
-                mask[n] = np.isin(child_pidx, list(allowed))
-
-        c_scores = V @ C.T
-        combined = (1.0 - alpha) * c_scores + alpha * p_scores[:, child_pidx]
-
-        # Pick best child per title
-        picks: List[Dict[str, Optional[str]]] = []
-        for i in range(V.shape[0]):
-            if mask is not None:
-                valid_idx = np.where(mask[i])[0]
-                if valid_idx.size == 0:
-                    j = int(np.argmax(p_scores[i]))
-                    picks.append({"t0": _PARENTS[j]["en"], "t1": None})
-                    continue
-                local_scores = combined[i, valid_idx]
-                best_local = valid_idx[int(np.argmax(local_scores))]
-            else:
-                best_local = int(np.argmax(combined[i]))
-            ch = _CHILDREN[best_local]
-            picks.append({"t0": ch["p_en"], "t1": ch["en"]})
+            # Scatter the top-k parents into a [N, P] table, then gather per child in one pass
+            parent_allowed = np.zeros(p_scores.shape, dtype=bool)
+            np.put_along_axis(parent_allowed, topP, True, axis=1)
+            mask = parent_allowed[:, child_pidx]
+
+        # combined = (1 - alpha) * c_scores + alpha * p_scores[:, child_pidx], built in place
+        combined = _label_scores(V, V_q, V_scale, _C_EMB_T, _C_EMB_Q, _C_SCALE)
+        combined *= 1.0 - alpha
+        parent_part = p_scores[:, child_pidx]
+        parent_part *= alpha
+        combined += parent_part
+
+        # Pick best child per title; titles with no allowed child fall back to the best parent
+        if mask is not None:
+            best_child, has_child = _pick_best_child(combined, mask)
+        else:
+            best_child = combined.argmax(axis=1)
+            has_child = np.ones(V.shape[0], dtype=bool)
+        best_parent = p_scores.argmax(axis=1)
+        child_idx = best_child[has_child]
+        parent_idx = best_parent[~has_child]
     else:
         # Parent-only fallback
-        picks = []
-        sims = p_scores
-        for i in range(V.shape[0]):
-            j = int(np.argmax(sims[i]))
-            picks.append({"t0": _PARENTS[j]["en"], "t1": None})
+        child_idx = np.empty(0, dtype=np.int64)
+        parent_idx = p_scores.argmax(axis=1)
 
-    # Aggregate histograms
+    # Aggregate histograms: count picked indices in NumPy, then map the few unique ids to names
     t0_counts: Dict[str, int] = {}
     t1_counts: Dict[str, int] = {}
-    for p in picks:
-        t0 = p["t0"]
-        t1 = p.get("t1")
-        t0_counts[t0] = t0_counts.get(t0, 0) + 1
+    uniq, counts = np.unique(child_idx, return_counts=True)
+    for j, c in zip(uniq.tolist(), counts.tolist()):
+        t0, t1 = _CHILDREN_META[j]
+        t0_counts[t0] = t0_counts.get(t0, 0) + c
         if t1:
             key = f"{t0} > {t1}"
-            t1_counts[key] = t1_counts.get(key, 0) + 1
+            t1_counts[key] = t1_counts.get(key, 0) + c
+    uniq, counts = np.unique(parent_idx, return_counts=True)
+    for j, c in zip(uniq.tolist(), counts.tolist()):
+        t0 = _PARENTS[j]["en"]
+        t0_counts[t0] = t0_counts.get(t0, 0) + c
 
     # Build nested tags_histogram: { Parent: { total, children: { Child: count } } }
     tags_histogram: Dict[str, Dict[str, Any]] = {}
@@ -302,11 +405,16 @@ def profile_histogram():
     }
 
 
+def _today_str() -> str:
+    # Local date as YYYY/MM/DD without going through strftime; only needed when the item has no date
+    t = time.localtime()
+    return f"{t.tm_year:04d}/{t.tm_mon:02d}/{t.tm_mday:02d}"
+
+
 @app.post("/recommend")
 async def recommend(req: RecommendRequest):
     # Try SQL-backed recommender first when enabled; fallback to search or curated
     _ensure_ready()
-    today = time.strftime("%Y/%m/%d")
 
     # Enable SQL recommender when explicitly requested via env, or implicitly when DB is configured and reachable
     use_sql_env = os.getenv("USE_SQL_RECO")
@@ -314,7 +422,7 @@ async def recommend(req: RecommendRequest):
     if use_sql_env is None:
         # No explicit env set; try auto-enable if DB is ready
         try:
-            info = db_ready_info()
+            info = await db_ready_info_async()
             use_sql = bool(info.get("ok") and info.get("connected"))
         except Exception:
             use_sql = False
@@ -324,46 +432,10 @@ async def recommend(req: RecommendRequest):
 
     logger.info("/recommend: use_sql=%s use_profile=%s tags=%s", use_sql, req.use_profile, req.tags)
 
-    # Log the three tags that will be attempted first
-    try:
-        if use_sql and req.use_profile:
-            # Profile-first attempt (top-3 from profile), then fallback to request tags
-            prof_tags: List[str] = []
-            try:
-                with open(PROFILE_PATH, "r", encoding="utf-8") as f:
-                    prof = json.load(f)
-                ranked = prof.get("t1_ranked") or []
-                for item_tag in ranked:
-                    if isinstance(item_tag, list) and item_tag:
-                        name = item_tag[0]
-                        if isinstance(name, str) and " > " in name:
-                            child = name.split(" > ", 1)[1]
-                        elif isinstance(name, str):
-                            child = name
-                        else:
-                            continue
-                        if child not in prof_tags:
-                            prof_tags.append(child)
-                        if len(prof_tags) >= 3:
-                            break
-            except Exception as e:
-                logger.info("/recommend: failed to read profile for tags: %s", e)
-            logger.info(
-                "/recommend: picked tags — first attempt (profile)=%s; fallback (request)=%s",
-                prof_tags, req.tags[:3]
-            )
-        else:
-            # Non-profile first attempt uses request tags
-            logger.info(
-                "/recommend: picked tags — first attempt=%s",
-                req.tags[:3]
-            )
-    except Exception as e:
-        logger.warning("/recommend: tag logging failed: %s", e)
-
     if use_sql:
         try:
-            item = sql_recommend(req.tags, use_profile=req.use_profile)
+            # Awaited on the async pool so the event loop keeps serving other requests meanwhile
+            item = await sql_recommend_async(req.tags, use_profile=req.use_profile, user_id=req.user_id)
             if item is not None:
                 logger.info("/recommend: used SQL recommender")
         except Exception as e:
@@ -398,7 +470,7 @@ async def recommend(req: RecommendRequest):
         title=title or "Untitled",
         source=source or "",
         url=url or "",
-        date=date_str or today,
+        date=date_str or _today_str(),
         image_url=image_url or "",
     )
 
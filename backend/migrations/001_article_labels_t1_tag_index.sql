@@ -0,0 +1,11 @@
+-- Index for the SQL recommender's candidate lookup (backend/src/sql_recommend.py).
+-- The query filters article_labels on level = 'T1' AND lower(tag) = ANY(...) and joins on article_id;
+-- this partial expression index serves the filter and carries article_id/score for the join + SUM.
+--
+-- Apply once against an existing database (CONCURRENTLY must run outside a transaction):
+--   psql "$DATABASE_URL" -f backend/migrations/001_article_labels_t1_tag_index.sql
+-- New databases get the same index from backend/tools/nyt_ingest.py.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS article_labels_t1_lower_tag
+    ON article_labels (lower(tag), article_id) INCLUDE (score)
+    WHERE level = 'T1';
@@ -0,0 +1,17 @@
+-- Stored, case-folded copy of article_labels.tag for the SQL recommender (backend/src/sql_recommend.py).
+-- The query now filters on l.tag_lower = ANY(...) instead of lower(l.tag), so the index is a plain
+-- column btree and no lower() runs per probe. Replaces the expression index from 001.
+--
+-- Apply once against an existing database (CONCURRENTLY must run outside a transaction):
+--   psql "$DATABASE_URL" -f backend/migrations/002_article_labels_tag_lower.sql
+-- Adding a STORED generated column rewrites article_labels (ACCESS EXCLUSIVE lock); run it off-peak.
+-- New databases get the same column and index from backend/tools/nyt_ingest.py.
+
+ALTER TABLE article_labels
+    ADD COLUMN IF NOT EXISTS tag_lower TEXT GENERATED ALWAYS AS (lower(tag)) STORED;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS article_labels_t1_tag_lower
+    ON article_labels (tag_lower, article_id) INCLUDE (score)
+    WHERE level = 'T1';
+
+DROP INDEX CONCURRENTLY IF EXISTS article_labels_t1_lower_tag;
@@ -0,0 +1,13 @@
+-- Per-user profile for the SQL recommender (backend/src/sql_recommend.py, SQL_PROFILE_SOURCE=db).
+-- t1_ranked has the same shape as profile.json: [["Parent > Child", count], ...]; the recommender
+-- extracts the top-3 T1 children inline, so requests no longer read or parse profile.json.
+--
+-- Apply once against an existing database:
+--   psql "$DATABASE_URL" -f backend/migrations/003_user_profiles.sql
+-- Load a profile with: python backend/tools/profile_ingest.py --user-id <id> --input backend/data/profile.json
+
+CREATE TABLE IF NOT EXISTS user_profiles (
+    user_id TEXT PRIMARY KEY,
+    t1_ranked JSONB NOT NULL DEFAULT '[]'::jsonb,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
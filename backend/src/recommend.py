@@ -1,17 +1,37 @@
 from __future__ import annotations
 
+import asyncio
+import functools
 import hashlib
 import json
 import os
+import sqlite3
+import threading
 import time
 from dataclasses import dataclass
 from datetime import datetime, timezone
 from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 import httpx
+import numpy as np
 from bs4 import BeautifulSoup
 from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
 
+# Prefer the C-backed selectolax parser when installed; fall back to BeautifulSoup's html.parser
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+except Exception:
+    try:
+        from selectolax.parser import HTMLParser  # selectolax < 1.0
+    except Exception:
+        HTMLParser = None  # type: ignore[assignment,misc]
+
+# Optional SIMD kernels for the candidate-vs-tags similarity; NumPy matmul otherwise
+try:
+    import simsimd
+except Exception:
+    simsimd = None  # type: ignore[assignment]
+
 from .models import Embedder
 
 
@@ -19,7 +39,9 @@ from .models import Embedder
 SEARCH_PROVIDER = os.getenv("SEARCH_PROVIDER", "serpapi").lower()  # 'serpapi' only for now
 SERPAPI_KEY = os.getenv("SERPAPI_KEY", "")
 REQUEST_TIMEOUT = float(os.getenv("REQUEST_TIMEOUT", "8.0"))
-ALLOWLIST = set((
+# Metadata lives in <head>; stop reading a page after </head> or this many bytes
+HEAD_MAX_BYTES = int(os.getenv("HEAD_MAX_BYTES", "65536"))
+_SEED_ALLOWLIST = {
     # a small seed allowlist; extend via env DOMAIN_ALLOWLIST comma-separated
     "www.theatlantic.com",
     "www.noahpinion.blog",
@@ -30,10 +52,11 @@ ALLOWLIST = set((
     "www.bbc.com",
     "www.ft.com",
     "www.economist.com",
-))
+}
 _extra_allow = os.getenv("DOMAIN_ALLOWLIST", "").strip()
 if _extra_allow:
-    ALLOWLIST |= set(x.strip() for x in _extra_allow.split(",") if x.strip())
+    _SEED_ALLOWLIST |= set(x.strip() for x in _extra_allow.split(",") if x.strip())
+ALLOWLIST = frozenset(_SEED_ALLOWLIST)
 
 DOMAIN_QUALITY = {
     "www.theatlantic.com": 0.9,
@@ -64,6 +87,7 @@ class Candidate:
 
 
 # ---------------- Utils ----------------
+@functools.lru_cache(maxsize=16384)
 def normalize_url(u: str) -> str:
     try:
         p = urlparse(u)
@@ -112,27 +136,48 @@ async def resolve_metadata(client: httpx.AsyncClient, url: str) -> Optional[Cand
     if ALLOWLIST and domain not in ALLOWLIST:
         return None
     try:
-        # HEAD then GET fallback
-        r = await client.head(norm, follow_redirects=True, timeout=REQUEST_TIMEOUT)
-        if r.status_code >= 400:
-            r = await client.get(norm, follow_redirects=True, timeout=REQUEST_TIMEOUT)
-        else:
-            # still fetch body for metadata
-            r = await client.get(norm, follow_redirects=True, timeout=REQUEST_TIMEOUT)
-        if r.status_code >= 400 or not r.text:
+        # Single streamed GET, read only up to the end of <head>
+        async with client.stream("GET", norm, follow_redirects=True, timeout=REQUEST_TIMEOUT) as r:
+            if r.status_code >= 400:
+                return None
+            buf = bytearray()
+            async for chunk in r.aiter_bytes():
+                tail = max(0, len(buf) - 6)  # </head> may straddle chunks
+                buf += chunk
+                if b"</head>" in buf[tail:].lower() or len(buf) >= HEAD_MAX_BYTES:
+                    break
+            try:
+                html = buf.decode(r.charset_encoding or "utf-8", errors="ignore")
+            except LookupError:
+                html = buf.decode("utf-8", errors="ignore")
+        if not html:
             return None
     except Exception:
         return None
 
-    soup = BeautifulSoup(r.text, "html.parser")
-    def meta(name: str, prop: bool = False) -> Optional[str]:
-        if prop:
-            el = soup.find("meta", attrs={"property": name})
-        else:
-            el = soup.find("meta", attrs={"name": name})
-        return el.get("content") if el and el.has_attr("content") else None
+    if HTMLParser is not None:
+        tree = HTMLParser(html)
 
-    title = meta("og:title", prop=True) or meta("twitter:title") or (soup.title.string.strip() if soup.title and soup.title.string else "")
+        def meta(name: str, prop: bool = False) -> Optional[str]:
+            attr = "property" if prop else "name"
+            node = tree.css_first(f'meta[{attr}="{name}"]')
+            return node.attributes.get("content") if node else None
+
+        title_node = tree.css_first("title")
+        page_title = title_node.text(strip=True) if title_node else ""
+    else:
+        soup = BeautifulSoup(html, "html.parser")
+
+        def meta(name: str, prop: bool = False) -> Optional[str]:
+            if prop:
+                el = soup.find("meta", attrs={"property": name})
+            else:
+                el = soup.find("meta", attrs={"name": name})
+            return el.get("content") if el and el.has_attr("content") else None
+
+        page_title = soup.title.string.strip() if soup.title and soup.title.string else ""
+
+    title = meta("og:title", prop=True) or meta("twitter:title") or page_title
     site = meta("og:site_name", prop=True) or meta("twitter:site") or domain
     author = meta("author") or meta("article:author", prop=True) or ""
     desc = meta("og:description", prop=True) or meta("description") or ""
@@ -153,87 +198,140 @@ async def resolve_metadata(client: httpx.AsyncClient, url: str) -> Optional[Cand
     return Candidate(url=norm, domain=domain, title=title or site, source=site, author=author or "", description=desc or "", published=published, paywall=paywall, image_url=img or "")
 
 
-def tag_vector(embedder: Embedder, tags: List[str]) -> Any:
-    txt = ", ".join(tags)
-    return embedder.encode([txt])[0]
-
-
-def clip01(x: float) -> float:
-    return max(0.0, min(1.0, x))
+@functools.lru_cache(maxsize=4096)
+def _tag_vec_cached(embedder: Embedder, tags_key: Tuple[str, ...]) -> bytes:
+    vec = embedder.encode([", ".join(tags_key)])[0]
+    return np.asarray(vec, dtype=np.float32).tobytes()
 
 
-def score_candidate(emb: Embedder, tag_vec, cand: Candidate, tags: List[str]) -> float:
-    # tag overlap: count of tag tokens in title lowercased / len(tags)
-    title_l = (cand.title or "").lower()
-    overlap = sum(1 for t in tags if t.lower() in title_l) / max(1, len(tags))
-    # embed sim between tags vector and candidate title+desc
-    txt = f"{cand.title}. {cand.description}".strip()
-    vec = emb.encode([txt])[0]
-    embed_sim = float((tag_vec @ vec))  # both normalized by Embedder
-    embed_sim = (embed_sim + 1.0) / 2.0  # normalize cosine [-1,1] → [0,1]
+def tag_vector(embedder: Embedder, tags: List[str]) -> Any:
+    # Tag sets recur across requests; key on the sorted tuple (order-insensitive, like cache_key)
+    return np.frombuffer(_tag_vec_cached(embedder, tuple(sorted(tags))), dtype=np.float32)
+
+
+_TEXT_VEC_CACHE: Dict[str, Any] = {}
+_TEXT_VEC_CACHE_MAX = 4096
+
+
+def text_vectors(embedder: Embedder, items: List[Tuple[str, str]]) -> Any:
+    """Embed (title, description) pairs, encoding all cache misses in one batch."""
+    keys = [hashlib.blake2b(f"{t}|{d}".encode("utf-8"), digest_size=16).hexdigest() for t, d in items]
+    misses = [i for i, k in enumerate(keys) if k not in _TEXT_VEC_CACHE]
+    fresh: Dict[str, Any] = {}
+    if misses:
+        texts = [f"{items[i][0]}. {items[i][1]}".strip() for i in misses]
+        M = embedder.encode(texts)
+        if len(_TEXT_VEC_CACHE) + len(misses) > _TEXT_VEC_CACHE_MAX:
+            _TEXT_VEC_CACHE.clear()
+        for i, vec in zip(misses, M):
+            fresh[keys[i]] = vec
+            _TEXT_VEC_CACHE[keys[i]] = vec
+    return np.stack([fresh.get(k, _TEXT_VEC_CACHE.get(k)) for k in keys])
+
+
+def tag_cosines(M: Any, tag_vec: Any) -> Any:
+    """Cosine of each row of M against tag_vec (rows and tag_vec L2-normalized by Embedder)."""
+    if simsimd is not None:
+        M32 = np.ascontiguousarray(M, dtype=np.float32)
+        t32 = np.ascontiguousarray(tag_vec, dtype=np.float32).reshape(1, -1)
+        return 1.0 - np.asarray(simsimd.cdist(M32, t32, metric="cosine"))[:, 0]
+    return M @ tag_vec
+
+
+def score_candidates(embed_sims: Any, cands: List[Candidate], tags_lc: Tuple[str, ...]) -> Any:
+    """Score all candidates in one vector pass; embed_sims[i] is cand i's tag cosine mapped to [0,1]."""
+    # tag overlap: count of (pre-lowercased) tags in title lowercased / len(tags); one lower() per title
+    titles_l = [(c.title or "").lower() for c in cands]
+    overlaps = np.array([
+        sum(1 for t in tags_lc if t in title_l) for title_l in titles_l
+    ], dtype=np.float32) / max(1, len(tags_lc))
     # domain quality
-    dq = DOMAIN_QUALITY.get(cand.domain, 0.6)
-    # recency (if available): within 3 years → linearly decay
-    rec = 0.5
-    if cand.published:
-        days = (datetime.now(timezone.utc).date() - cand.published.date()).days
-        if days <= 0:
-            rec = 1.0
-        elif days >= 365 * 3:
-            rec = 0.2
-        else:
-            rec = 1.0 - (days / (365 * 3)) * 0.8  # 1.0 → 0.2 over 3 years
-        rec = clip01(rec)
+    dqs = np.array([DOMAIN_QUALITY.get(c.domain, 0.6) for c in cands], dtype=np.float32)
+    # recency (if available): within 3 years → linearly decay 1.0 → 0.2; unknown → 0.5
+    today = datetime.now(timezone.utc).date()
+    days = np.array([
+        (today - c.published.date()).days if c.published else np.nan for c in cands
+    ], dtype=np.float32)
+    recs = np.where(np.isnan(days), 0.5, np.clip(1.0 - (days / (365 * 3)) * 0.8, 0.2, 1.0))
     # weighted sum (design doc): 0.5 overlap + 0.2 embed + 0.2 domain + 0.1 recency
-    score = 0.5 * overlap + 0.2 * embed_sim + 0.2 * dq + 0.1 * rec
-    return float(score)
+    return 0.5 * overlaps + 0.2 * np.asarray(embed_sims) + 0.2 * dqs + 0.1 * recs
 
 
 # ---------------- Cache ----------------
 _MEM_CACHE: Dict[str, Dict[str, Any]] = {}
+_MEM_CACHE_MAX = 1024
+# Keys embed the current local date, so a row stops being hit within a day of being written;
+# two days leaves a day of slack (clock/time-zone changes) before it is pruned
+_DISK_TTL_SECONDS = 2 * 24 * 3600
 CACHE_DIR = os.getenv("CACHE_DIR", "backend/out")
 os.makedirs(CACHE_DIR, exist_ok=True)
-DISK_CACHE = os.path.join(CACHE_DIR, "reco_cache.json")
+DISK_CACHE = os.path.join(CACHE_DIR, "reco_cache.sqlite3")
+_DISK_CONN: Optional[sqlite3.Connection] = None
+_DISK_LOCK = threading.Lock()
+
+
+def _disk_conn() -> sqlite3.Connection:
+    # One shared connection; _DISK_LOCK serializes its use within this process (lookups are
+    # single-row primary-key reads). WAL lets other processes on the same file read during a write.
+    # Rows older than _DISK_TTL_SECONDS (two days) are pruned once when the connection opens.
+    global _DISK_CONN
+    if _DISK_CONN is None:
+        conn = sqlite3.connect(DISK_CACHE, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS reco_cache (k TEXT PRIMARY KEY, v TEXT NOT NULL, ts INTEGER NOT NULL)")
+        conn.execute("DELETE FROM reco_cache WHERE ts < ?", (int(time.time()) - _DISK_TTL_SECONDS,))
+        conn.commit()
+        _DISK_CONN = conn
+    return _DISK_CONN
 
 
 def cache_key(tags: List[str]) -> str:
-    key = ",".join(sorted(tags)) + ":" + time.strftime("%Y-%m-%d")
-    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+    t = time.localtime()
+    key = f"{','.join(sorted(tags))}:{t.tm_year:04d}-{t.tm_mon:02d}-{t.tm_mday:02d}"
+    return hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _mem_put(key: str, val: Dict[str, Any]) -> None:
+    if len(_MEM_CACHE) >= _MEM_CACHE_MAX and key not in _MEM_CACHE:
+        _MEM_CACHE.clear()
+    _MEM_CACHE[key] = val
 
 
 def cache_get(key: str) -> Optional[Dict[str, Any]]:
     if key in _MEM_CACHE:
         return _MEM_CACHE[key]
     try:
-        if os.path.exists(DISK_CACHE):
-            with open(DISK_CACHE, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            if key in data:
-                _MEM_CACHE[key] = data[key]
-                return data[key]
+        with _DISK_LOCK:
+            row = _disk_conn().execute("SELECT v FROM reco_cache WHERE k = ?", (key,)).fetchone()
+        if row:
+            val = json.loads(row[0])
+            _mem_put(key, val)
+            return val
     except Exception:
         pass
     return None
 
 
 def cache_put(key: str, val: Dict[str, Any]) -> None:
-    _MEM_CACHE[key] = val
+    _mem_put(key, val)
     try:
-        data = {}
-        if os.path.exists(DISK_CACHE):
-            with open(DISK_CACHE, "r", encoding="utf-8") as f:
-                data = json.load(f)
-        data[key] = val
-        with open(DISK_CACHE, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        with _DISK_LOCK:
+            conn = _disk_conn()
+            conn.execute(
+                "INSERT OR REPLACE INTO reco_cache (k, v, ts) VALUES (?, ?, ?)",
+                (key, json.dumps(val, ensure_ascii=False), int(time.time())),
+            )
+            conn.commit()
     except Exception:
         pass
 
 
 # ---------------- Orchestrator ----------------
 async def recommend_piece(tags: List[str], embedder: Embedder) -> Optional[Dict[str, Any]]:
+    tags_lc = tuple(t.lower() for t in tags)
     key = cache_key(tags)
-    cached = cache_get(key)
+    # Memory hits stay on the loop; the SQLite read (and the lock shared with cache_put) runs in a thread
+    cached = _MEM_CACHE.get(key) or await asyncio.to_thread(cache_get, key)
     if cached:
         return cached
 
@@ -244,42 +342,46 @@ async def recommend_piece(tags: List[str], embedder: Embedder) -> Optional[Dict[
     queries = expand_queries(tags)
     async with httpx.AsyncClient(headers={"User-Agent": "thyself/1.0"}) as client:
         links: List[str] = []
-        for q in queries:
-            try:
-                lst = await search_serpapi(client, q, topk=5)
-                links.extend(lst)
-            except Exception:
+        results = await asyncio.gather(*[search_serpapi(client, q, topk=5) for q in queries], return_exceptions=True)
+        for lst in results:
+            if isinstance(lst, BaseException):
                 continue
-        # Dedupe links
+            links.extend(lst)
+        # Dedupe links and drop non-allowlisted domains before any HTTP fetch
         seen = set()
         uniq_links = []
         for u in links:
             nu = normalize_url(u)
-            if nu not in seen:
-                uniq_links.append(nu)
-                seen.add(nu)
-
-        # Resolve metadata and score
-        tag_vec = tag_vector(embedder, tags)
-        cands: List[Candidate] = []
-        for u in uniq_links:
-            cand = await resolve_metadata(client, u)
-            if not cand:
+            if nu in seen:
+                continue
+            seen.add(nu)
+            if ALLOWLIST and urlparse(nu).netloc not in ALLOWLIST:
                 continue
-            cand.score = score_candidate(embedder, tag_vec, cand, tags)
-            cands.append(cand)
+            uniq_links.append(nu)
+
+        # Resolve metadata concurrently
+        resolved = await asyncio.gather(*[resolve_metadata(client, u) for u in uniq_links], return_exceptions=True)
+        cands: List[Candidate] = [c for c in resolved if isinstance(c, Candidate)]
 
     if not cands:
         return None
 
-    # Pick best
-    cands.sort(key=lambda x: (-x.score, x.domain, x.title))
-    best = cands[0]
+    # Score: one batched encode + one matmul for all candidates
+    tag_vec = tag_vector(embedder, tags)
+    M = text_vectors(embedder, [(c.title, c.description) for c in cands])
+    sims = (tag_cosines(M, tag_vec) + 1.0) * 0.5  # cosine [-1,1] → [0,1]
+    scores = score_candidates(sims, cands, tags_lc)
+    for cand, score in zip(cands, scores.tolist()):
+        cand.score = score
+
+    # Pick best: single O(K) pass with the same (score desc, domain, title) tie-breakers
+    best = min(cands, key=lambda x: (-x.score, x.domain, x.title))
     item = {
         "title": best.title,
         "source": best.source or best.domain,
         "url": best.url,
         "image_url": best.image_url or "",
     }
-    cache_put(key, item)
+    # Disk write runs off the event loop
+    await asyncio.to_thread(cache_put, key, item)
     return item
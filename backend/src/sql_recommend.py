@@ -1,81 +1,197 @@
+"""
+SQL-backed recommender over the NYT ingest tables (articles + article_labels).
+
+The candidate query expects the article_labels.tag_lower column and partial index from
+backend/migrations/002_article_labels_tag_lower.sql; without the index Postgres scans article_labels per request.
+"""
 from __future__ import annotations
 
+import asyncio
 import os
 import json
-import math
 import datetime as dt
 from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 import psycopg
-from psycopg.rows import dict_row
+from psycopg.rows import dict_row, tuple_row
+from psycopg_pool import AsyncConnectionPool, ConnectionPool, PoolTimeout
 import logging
+import threading
 
 
-# Simple cached connection helper (blocking; fine for dev)
-_CONN: Optional[psycopg.Connection] = None
+# Shared connection pool (blocking; safe for concurrent requests), built lazily on first use
+_POOL: Optional[ConnectionPool] = None
+_POOL_LOCK = threading.Lock()
+# Async twin for recommend_from_db_async; its lock is created on first use inside the running loop
+_ASYNC_POOL: Optional[AsyncConnectionPool] = None
+_ASYNC_POOL_LOCK: Optional[asyncio.Lock] = None
+POOL_MIN_SIZE = int(os.getenv("PGPOOL_MIN_SIZE", "2"))
+POOL_MAX_SIZE = int(os.getenv("PGPOOL_MAX_SIZE", "10"))
+POOL_TIMEOUT = float(os.getenv("PGPOOL_TIMEOUT", "5.0"))
+STATEMENT_TIMEOUT = os.getenv("PG_STATEMENT_TIMEOUT", "2s")
+# "db": use_profile reads the caller's t1_ranked from user_profiles (see tools/profile_ingest.py) instead of profile.json
+PROFILE_SOURCE = os.getenv("SQL_PROFILE_SOURCE", "file").lower()
+CONNECT_TIMEOUT = int(os.getenv("PGCONNECT_TIMEOUT", "2"))
 _LOGGER = logging.getLogger(__name__)
 if os.getenv("RECO_DEBUG", "0").lower() in {"1", "true", "yes"}:
     _LOGGER.setLevel(logging.DEBUG)
 
 
-def _connect() -> psycopg.Connection:
-    global _CONN
-    if _CONN and not _CONN.closed:
-        return _CONN
-    host = os.getenv("PGHOST")
-    port = int(os.getenv("PGPORT", "5432"))
-    dbname = os.getenv("PGDATABASE")
-    user = os.getenv("PGUSER")
-    password = os.getenv("PGPASSWORD", "")
-    sslmode = os.getenv("PGSSLMODE", "require")
-    if not host or not dbname or not user:
+def _pg_settings() -> Dict[str, Any]:
+    return {
+        "host": os.getenv("PGHOST"),
+        "port": int(os.getenv("PGPORT", "5432")),
+        "dbname": os.getenv("PGDATABASE"),
+        "user": os.getenv("PGUSER"),
+        "password": os.getenv("PGPASSWORD", ""),
+        "sslmode": os.getenv("PGSSLMODE", "require"),
+        "connect_timeout": CONNECT_TIMEOUT,
+    }
+
+
+def _configure_conn(conn: psycopg.Connection) -> None:
+    conn.execute("SELECT set_config('statement_timeout', %s, false)", (STATEMENT_TIMEOUT,))
+    conn.commit()
+
+
+def _pool_kwargs() -> Dict[str, Any]:
+    cfg = _pg_settings()
+    if not cfg["host"] or not cfg["dbname"] or not cfg["user"]:
         raise RuntimeError("Postgres env vars missing (PGHOST, PGDATABASE, PGUSER)")
-    dsn = f"host={host} port={port} dbname={dbname} user={user} sslmode={sslmode}"
-    if password:
-        dsn = dsn + f" password={password}"
-    _LOGGER.debug("sql_recommend: connecting to PG host=%s db=%s user=%s sslmode=%s", host, dbname, user, sslmode)
-    _CONN = psycopg.connect(dsn, row_factory=dict_row)
-    return _CONN
+    kwargs: Dict[str, Any] = {k: v for k, v in cfg.items() if v != ""}
+    kwargs["row_factory"] = dict_row
+    _LOGGER.debug(
+        "sql_recommend: opening PG pool host=%s db=%s user=%s sslmode=%s size=%d..%d",
+        cfg["host"], cfg["dbname"], cfg["user"], cfg["sslmode"], POOL_MIN_SIZE, POOL_MAX_SIZE,
+    )
+    return kwargs
 
 
-def db_ready_info() -> Dict[str, Any]:
-    """Lightweight readiness info for Postgres connectivity used by /readyz."""
-    host = os.getenv("PGHOST")
-    port = int(os.getenv("PGPORT", "5432"))
-    dbname = os.getenv("PGDATABASE")
-    user = os.getenv("PGUSER")
-    password = os.getenv("PGPASSWORD", "")
-    sslmode = os.getenv("PGSSLMODE", "require")
-    configured = bool(host and dbname and user)
+def _get_pool() -> ConnectionPool:
+    global _POOL
+    if _POOL is not None and not _POOL.closed:
+        return _POOL
+    with _POOL_LOCK:
+        if _POOL is not None and not _POOL.closed:
+            return _POOL
+        _POOL = ConnectionPool(
+            kwargs=_pool_kwargs(),
+            min_size=POOL_MIN_SIZE,
+            max_size=POOL_MAX_SIZE,
+            timeout=POOL_TIMEOUT,
+            configure=_configure_conn,
+            name="sql_recommend",
+            open=True,
+        )
+        return _POOL
+
+
+async def _configure_conn_async(conn: psycopg.AsyncConnection) -> None:
+    await conn.execute("SELECT set_config('statement_timeout', %s, false)", (STATEMENT_TIMEOUT,))
+    await conn.commit()
+
+
+async def _get_async_pool() -> AsyncConnectionPool:
+    """Event-loop counterpart of _get_pool for recommend_from_db_async; opened on first await."""
+    global _ASYNC_POOL, _ASYNC_POOL_LOCK
+    if _ASYNC_POOL is not None and not _ASYNC_POOL.closed:
+        return _ASYNC_POOL
+    if _ASYNC_POOL_LOCK is None:
+        _ASYNC_POOL_LOCK = asyncio.Lock()
+    async with _ASYNC_POOL_LOCK:
+        if _ASYNC_POOL is not None and not _ASYNC_POOL.closed:
+            return _ASYNC_POOL
+        pool = AsyncConnectionPool(
+            kwargs=_pool_kwargs(),
+            min_size=POOL_MIN_SIZE,
+            max_size=POOL_MAX_SIZE,
+            timeout=POOL_TIMEOUT,
+            configure=_configure_conn_async,
+            name="sql_recommend_async",
+            open=False,
+        )
+        await pool.open()
+        _ASYNC_POOL = pool
+        return _ASYNC_POOL
+
+
+def _ready_info_base() -> Dict[str, Any]:
+    cfg = _pg_settings()
+    configured = bool(cfg["host"] and cfg["dbname"] and cfg["user"])
     info: Dict[str, Any] = {
         "ok": False,
         "configured": configured,
-        "host": host or "",
-        "port": port,
-        "dbname": dbname or "",
-        "user": user or "",
-        "sslmode": sslmode,
+        "host": cfg["host"] or "",
+        "port": cfg["port"],
+        "dbname": cfg["dbname"] or "",
+        "user": cfg["user"] or "",
+        "sslmode": cfg["sslmode"],
         "connected": False,
     }
     if not configured:
         info["error"] = "Missing PGHOST/PGDATABASE/PGUSER"
+    return info
+
+
+def db_ready_info() -> Dict[str, Any]:
+    """Lightweight readiness info for Postgres connectivity, on the sync pool (for sync callers)."""
+    info = _ready_info_base()
+    if not info["configured"]:
         return info
     try:
-        dsn = f"host={host} port={port} dbname={dbname} user={user} sslmode={sslmode}"
-        if password:
-            dsn = dsn + f" password={password}"
-        with psycopg.connect(dsn) as conn:
-            with conn.cursor() as cur:
-                cur.execute("SELECT 1;")
-                _ = cur.fetchone()
+        pool = _get_pool()
+        stats = pool.get_stats()
+        info["pool_size"] = stats.get("pool_size", 0)
+        info["pool_available"] = stats.get("pool_available", 0)
+        # Idle pooled connections mean the pool is healthy; only probe the server when none are idle
+        if info["pool_available"] <= 0:
+            with pool.connection(timeout=CONNECT_TIMEOUT) as conn:
+                conn.execute("SELECT 1;").fetchone()
         info["ok"] = True
         info["connected"] = True
+    except PoolTimeout:
+        info["error"] = f"No Postgres connection available within {CONNECT_TIMEOUT}s"
     except Exception as e:
         info["error"] = str(e)
     return info
 
 
+async def db_ready_info_async() -> Dict[str, Any]:
+    """db_ready_info against the async pool that /recommend uses; this is what /readyz reports."""
+    info = _ready_info_base()
+    if not info["configured"]:
+        return info
+    try:
+        pool = await _get_async_pool()
+        stats = pool.get_stats()
+        info["pool_size"] = stats.get("pool_size", 0)
+        info["pool_available"] = stats.get("pool_available", 0)
+        if info["pool_available"] <= 0:
+            async with pool.connection(timeout=CONNECT_TIMEOUT) as conn:
+                await (await conn.execute("SELECT 1;")).fetchone()
+        info["ok"] = True
+        info["connected"] = True
+    except PoolTimeout:
+        info["error"] = f"No Postgres connection available within {CONNECT_TIMEOUT}s"
+    except Exception as e:
+        info["error"] = str(e)
+    return info
+
+
+# Parsed profile tags keyed on (path, mtime_ns, size, k); a rewrite of profile.json changes the key
+_PROFILE_CACHE: Dict[Tuple[str, int, int, int], List[str]] = {}
+_PROFILE_CACHE_MAX = 32
+
+
 def _load_profile_top_t1(profile_path: str, k: int = 3) -> List[str]:
+    try:
+        st = os.stat(profile_path)
+    except Exception as e:
+        raise RuntimeError(f"Failed to load profile at {profile_path}: {e}")
+    key = (profile_path, st.st_mtime_ns, st.st_size, k)
+    cached = _PROFILE_CACHE.get(key)
+    if cached is not None:
+        return list(cached)
     try:
         with open(profile_path, "r", encoding="utf-8") as f:
             prof = json.load(f)
@@ -99,41 +215,218 @@ def _load_profile_top_t1(profile_path: str, k: int = 3) -> List[str]:
         if len(tags) >= k:
             break
     _LOGGER.debug("sql_recommend: profile top T1s → %s", tags)
-    return tags
+    if len(_PROFILE_CACHE) >= _PROFILE_CACHE_MAX:
+        _PROFILE_CACHE.clear()
+    _PROFILE_CACHE[key] = tags
+    return list(tags)
 
 
-def _recency_score(pub_date: Optional[dt.datetime], decay_days: float = 90.0) -> float:
-    if not pub_date:
-        return 0.0
-    if pub_date.tzinfo is None:
-        pub_date = pub_date.replace(tzinfo=dt.timezone.utc)
-    now = dt.datetime.now(dt.timezone.utc)
-    days = max((now - pub_date).days, 0)
-    return math.exp(-days / max(decay_days, 1e-6))
-
-
-def _fetch_candidates(tags_lower: Sequence[str], limit: int = 200) -> List[Dict[str, Any]]:
-    if not tags_lower:
-        return []
-    sql = """
-    SELECT a.id, a.title, a.web_url, a.byline, a.section_name, a.news_desk, a.pub_date,
-           COALESCE(a.image_url, '') AS image_url,
-           json_agg(json_build_object('tag', l.tag, 'score', l.score, 'parent_t0', l.parent_t0)) AS labels
-    FROM articles a
-    JOIN article_labels l ON l.article_id = a.id AND l.level = 'T1'
-    WHERE lower(l.tag) = ANY(%(tags)s)
-    GROUP BY a.id
-    ORDER BY a.pub_date DESC NULLS LAST
-    LIMIT %(limit)s
+# Per-attempt scoring body; %(tags_expr)s is filled at import time with the attempt's text[] expression.
+#   tag_score = sum of matched T1 label scores (the WHERE clause keeps only matched labels)
+#   recency   = exp(-max(age_days, 0) / decay_days) with age measured from %(now)s, 0 when pub_date is NULL
+_ATTEMPT_SQL = """
+        SELECT %(src)d AS src, a.id, a.title, a.web_url, a.byline, a.pub_date,
+               COALESCE(a.image_url, '') AS image_url,
+               SUM(l.score) AS tag_score,
+               CASE WHEN a.pub_date IS NULL THEN 0
+                    ELSE exp(-GREATEST(floor(EXTRACT(EPOCH FROM (%%(now)s - a.pub_date)) / 86400), 0) / %%(decay)s)
+               END AS recency
+        FROM articles a
+        JOIN article_labels l ON l.article_id = a.id
+        -- Same predicate/column as the article_labels_t1_tag_lower partial index
+        WHERE l.level = 'T1' AND l.tag_lower = ANY(%(tags_expr)s)%(extra)s
+        GROUP BY a.id
+"""
+
+# Profile tags from the bound %(prof)s list (profile.json, or no profile at all).
+# Never references user_profiles, so it also runs on DBs where that table was never created.
+_FILE_PROFILE_TAGS_SQL = """
+        SELECT %(prof)s::text[] AS tags
+"""
+
+# Profile tags for SQL_PROFILE_SOURCE=db requests with a user_id: the first three distinct lowercased
+# T1 children of user_profiles.t1_ranked ([["Parent > Child", count], ...]).
+_DB_PROFILE_TAGS_SQL = """
+        SELECT ARRAY(
+            SELECT child FROM (
+                SELECT DISTINCT ON (child) child, ord
+                FROM (
+                    SELECT lower(btrim(CASE WHEN position(' > ' IN e.item->>0) > 0
+                                            THEN substr(e.item->>0, position(' > ' IN e.item->>0) + 3)
+                                            ELSE e.item->>0 END)) AS child,
+                           e.ord
+                    FROM jsonb_array_elements(p.t1_ranked) WITH ORDINALITY AS e(item, ord)
+                    WHERE jsonb_typeof(e.item) = 'array' AND jsonb_typeof(e.item->0) = 'string'
+                ) named
+                WHERE child <> ''
+                ORDER BY child, ord
+            ) firsts
+            ORDER BY ord
+            LIMIT 3
+        ) AS tags
+        FROM user_profiles p
+        WHERE p.user_id = %(user_id)s
+"""
+
+
+def _build_candidate_sql(profile_tags_sql: str) -> str:
+    # Both attempts in one statement: base tags are only scored when the profile tags match nothing.
+    return """
+    WITH prof_tags AS (%s), profile_try AS (%s), base_try AS (%s)
+    SELECT src, id, tag_score, recency,
+           %%(w_tag)s * tag_score + %%(w_recency)s * recency AS score,
+           -- API fields, shaped here so the winning row maps straight onto the response
+           COALESCE(NULLIF(title, ''), 'Untitled') AS title,
+           -- Only a leading "By " is dropped (a bare replace() also mangled e.g. "Byron ... By Two")
+           COALESCE(NULLIF(btrim(CASE WHEN byline LIKE 'By %%%%' THEN substr(byline, 4) ELSE COALESCE(byline, '') END), ''),
+                    'New York Times') AS source,
+           COALESCE(web_url, '') AS url,
+           to_char(COALESCE(pub_date, %%(now)s), 'YYYY/MM/DD') AS date,
+           image_url
+    FROM (SELECT * FROM profile_try UNION ALL SELECT * FROM base_try) c
+    ORDER BY src, score DESC NULLS LAST, pub_date DESC NULLS LAST
+    LIMIT %%(limit)s
+    """ % (
+        profile_tags_sql,
+        _ATTEMPT_SQL % {"src": 0, "tags_expr": "(SELECT tags FROM prof_tags LIMIT 1)::text[]", "extra": ""},
+        _ATTEMPT_SQL % {
+            "src": 1,
+            "tags_expr": "%(base)s",
+            "extra": "\n          AND NOT EXISTS (SELECT 1 FROM profile_try)",
+        },
+    )
+
+
+# Module constants so psycopg's prepared-statement keys are stable
+_CANDIDATE_SQL = _build_candidate_sql(_FILE_PROFILE_TAGS_SQL)
+_CANDIDATE_SQL_DB = _build_candidate_sql(_DB_PROFILE_TAGS_SQL)
+
+
+def _candidate_sql(params: Dict[str, Any]) -> str:
+    # user_id is only set for SQL_PROFILE_SOURCE=db requests (see _request_params)
+    return _CANDIDATE_SQL_DB if params["user_id"] is not None else _CANDIDATE_SQL
+
+
+def _candidate_params(
+    prof_lower: Sequence[str],
+    base_lower: Sequence[str],
+    *,
+    decay_days: float,
+    w_tag: float,
+    w_recency: float,
+    now: dt.datetime,
+    user_id: Optional[str] = None,
+    limit: int = 1,
+) -> Dict[str, Any]:
+    return {
+        "now": now,
+        "user_id": user_id,
+        "prof": list(prof_lower),
+        "base": list(base_lower),
+        "decay": max(decay_days, 1e-6),
+        "w_tag": w_tag,
+        "w_recency": w_recency,
+        "limit": limit,
+    }
+
+
+def _log_fetched(rows: Sequence[Tuple[Any, ...]], params: Dict[str, Any]) -> None:
+    if not _LOGGER.isEnabledFor(logging.DEBUG):
+        return
+    _LOGGER.debug(
+        "sql_recommend: fetched %d candidates for prof=%s base=%s",
+        len(rows), f"user_profiles[{params['user_id']}]" if params["user_id"] else params["prof"], params["base"],
+    )
+
+
+def _fetch_candidates(params: Dict[str, Any]) -> List[Tuple[Any, ...]]:
+    """Top `limit` scored articles (best first), from the profile tags if any match, else the base tags.
+
+    With `user_id` set, the profile tags come from user_profiles and `prof` is ignored.
+
+    Rows are plain tuples in _CANDIDATE_SQL column order:
+    (src, id, tag_score, recency, score, title, source, url, date, image_url), src 0 = profile, 1 = base.
     """
-    conn = _connect()
-    with conn.cursor() as cur:
-        cur.execute(sql, {"tags": list(tags_lower), "limit": limit})
-        rows = cur.fetchall() or []
-    _LOGGER.debug("sql_recommend: fetched %d candidates for tags=%s", len(rows), list(tags_lower))
+    with _get_pool().connection() as conn:
+        # prepare=True: the server parses/plans this join+aggregate once per connection
+        # tuple_row: no per-row dict for this hot query; the pool default stays dict_row
+        with conn.cursor(row_factory=tuple_row) as cur:
+            rows = cur.execute(_candidate_sql(params), params, prepare=True).fetchall() or []
+    _log_fetched(rows, params)
+    return rows
+
+
+async def _fetch_candidates_async(params: Dict[str, Any]) -> List[Tuple[Any, ...]]:
+    """Async twin of _fetch_candidates on the AsyncConnectionPool."""
+    pool = await _get_async_pool()
+    async with pool.connection() as conn:
+        async with conn.cursor(row_factory=tuple_row) as cur:
+            await cur.execute(_candidate_sql(params), params, prepare=True)
+            rows = await cur.fetchall() or []
+    _log_fetched(rows, params)
     return rows
 
 
+def _request_params(
+    tags: Sequence[str],
+    *,
+    use_profile: bool,
+    profile_path: str,
+    decay_days: float,
+    w_tag: float,
+    w_recency: float,
+    user_id: Optional[str],
+) -> Optional[Dict[str, Any]]:
+    """Build the candidate query parameters for one request, or None when there are no tags to try."""
+    # Build the two tag attempts (profile first, then provided tags)
+    # Lowercased and de-duplicated once here (order kept); SQL matches them against tag_lower
+    base = list(dict.fromkeys(str(t).strip().lower() for t in tags if t and str(t).strip()))[:3]
+    prof: List[str] = []
+    profile_user = ((user_id or "").strip() or None) if use_profile and PROFILE_SOURCE == "db" else None
+    if use_profile and profile_user is None:
+        try:
+            prof = list(dict.fromkeys(t.strip().lower() for t in _load_profile_top_t1(profile_path, k=3) if t.strip()))[:3]
+        except Exception as e:
+            _LOGGER.warning("sql_recommend: failed to load profile: %s", e)
+            prof = []
+
+    if not prof and not base and profile_user is None:
+        _LOGGER.info("sql_recommend: no tags provided/derived; cannot recommend")
+        return None
+
+    _LOGGER.info(
+        "sql_recommend: trying profile tags=%s then tags=%s (use_profile=%s)",
+        f"user_profiles[{profile_user}]" if profile_user else prof, base, use_profile,
+    )
+    # Only the winner is needed unless DEBUG wants the runners-up logged
+    limit = 5 if _LOGGER.isEnabledFor(logging.DEBUG) else 1
+    # One clock read per request, shared by the SQL recency term and the missing-date fallback
+    now = dt.datetime.now(dt.timezone.utc)
+    return _candidate_params(
+        prof, base, decay_days=decay_days, w_tag=w_tag, w_recency=w_recency, now=now,
+        user_id=profile_user, limit=limit,
+    )
+
+
+def _pick(candidates: Sequence[Tuple[Any, ...]]) -> Optional[Dict[str, Any]]:
+    if not candidates:
+        _LOGGER.info("sql_recommend: 0 candidates for profile or provided tags")
+        return None
+
+    src, _id, _tag, _rec, _score, title, source, url, date_str, image_url = candidates[0]
+    _LOGGER.info("sql_recommend: picked from %s tags", "profile" if src == 0 else "provided")
+
+    # Runner-up rows are only fetched (limit=5) and logged when DEBUG is on
+    if _LOGGER.isEnabledFor(logging.DEBUG):
+        for row in candidates:
+            _LOGGER.debug(
+                "sql_recommend: cand title='%s' score=%.4f tag=%.4f rec=%.4f",
+                row[5], row[4], row[2], row[3],
+            )
+
+    return {"title": title, "source": source, "url": url, "date": date_str, "image_url": image_url}
+
+
 def recommend_from_db(
     tags: Sequence[str],
     *,
@@ -142,115 +435,53 @@ def recommend_from_db(
     decay_days: float = 90.0,
     w_tag: float = 0.7,
     w_recency: float = 0.3,
+    user_id: Optional[str] = None,
 ) -> Optional[Dict[str, Any]]:
     """
-    Recommend one article from Postgres using simple scoring:
+    Recommend one article from Postgres using simple scoring (computed in SQL, see _CANDIDATE_SQL):
     score = w_tag * sum(label_score for matched tags) + w_recency * exp(-age_days / decay_days)
 
     Strategy:
       - If use_profile=True: try top-3 T1s from profile.json first; if no candidates, fall back to provided tags.
+        With SQL_PROFILE_SOURCE=db and a user_id, the top-3 T1s are read from user_profiles inside the same query.
       - If use_profile=False: use provided tags only.
 
     Returns dict: { title, source, url, date } or None
     """
-    # Build list of tag attempts in order
-    attempts: List[List[str]] = []
-    base = [t for t in tags if t and str(t).strip()]
-    if use_profile:
-        try:
-            prof = _load_profile_top_t1(profile_path, k=3)
-        except Exception as e:
-            _LOGGER.warning("sql_recommend: failed to load profile: %s", e)
-            prof = []
-        if prof:
-            attempts.append(prof[:3])
-    if base:
-        attempts.append(base[:3])
-
-    if not attempts:
-        _LOGGER.info("sql_recommend: no tags provided/derived; cannot recommend")
+    params = _request_params(
+        tags, use_profile=use_profile, profile_path=profile_path,
+        decay_days=decay_days, w_tag=w_tag, w_recency=w_recency, user_id=user_id,
+    )
+    if params is None:
         return None
+    try:
+        candidates = _fetch_candidates(params)
+    except Exception as e:
+        _LOGGER.warning("sql_recommend: fetch failed: %s", e)
+        return None
+    return _pick(candidates)
 
-    last_error: Optional[str] = None
-    for idx, ts in enumerate(attempts):
-        tags_lower = [str(t).strip().lower() for t in ts if t and str(t).strip()]
-        _LOGGER.info("sql_recommend: attempt %d using tags=%s (use_profile=%s)", idx + 1, tags_lower, use_profile)
-        try:
-            candidates = _fetch_candidates(tags_lower, limit=200)
-        except Exception as e:
-            last_error = str(e)
-            _LOGGER.warning("sql_recommend: fetch failed on attempt %d: %s", idx + 1, e)
-            continue
-
-        _LOGGER.debug("sql_recommend: fetched %d candidates for tags=%s", len(candidates), tags_lower)
-        if not candidates:
-            continue
-
-        best = None
-        best_score = -1.0
-        debug_rows: List[Tuple[float, str, float, float]] = []  # (score, title, tag_score, recency)
-        for row in candidates:
-            labels = row.get("labels") or []
-            tag_score = 0.0
-            for lab in labels:
-                tag = str(lab.get("tag", "")).lower()
-                if tag in tags_lower:
-                    try:
-                        tag_score += float(lab.get("score", 0.0))
-                    except Exception:
-                        tag_score += 0.0
-            # recency
-            pub_date = row.get("pub_date")
-            if isinstance(pub_date, str):
-                try:
-                    pub_date_dt = dt.datetime.fromisoformat(pub_date.replace("Z", "+00:00"))
-                except Exception:
-                    pub_date_dt = None
-            else:
-                pub_date_dt = pub_date
-            rec = _recency_score(pub_date_dt, decay_days=decay_days)
-            score = w_tag * tag_score + w_recency * rec
-            debug_rows.append((score, str(row.get("title") or ""), tag_score, rec))
-            if score > best_score:
-                best_score = score
-                best = row
-
-        if best is None:
-            continue
-
-        if _LOGGER.isEnabledFor(logging.DEBUG):
-            topk = sorted(debug_rows, key=lambda x: -x[0])[:5]
-            for s, title, ts_val, rec in topk:
-                _LOGGER.debug("sql_recommend: cand title='%s' score=%.4f tag=%.4f rec=%.4f", title, s, ts_val, rec)
 
-        # Map to API schema
-        src = (best.get("byline") or "").replace("By ", "").strip()
-        url = best.get("web_url") or ""
-        title = best.get("title") or "Untitled"
-        pub_date = best.get("pub_date")
-        try:
-            if isinstance(pub_date, str):
-                d = dt.datetime.fromisoformat(pub_date.replace("Z", "+00:00"))
-            elif isinstance(pub_date, dt.datetime):
-                d = pub_date
-            else:
-                d = dt.datetime.now(dt.timezone.utc)
-            if d.tzinfo is None:
-                d = d.replace(tzinfo=dt.timezone.utc)
-            date_str = d.strftime("%Y/%m/%d")
-        except Exception:
-            date_str = dt.datetime.now(dt.timezone.utc).strftime("%Y/%m/%d")
-
-        return {
-            "title": title,
-            "source": src or "New York Times",
-            "url": url,
-            "date": date_str,
-            "image_url": (best.get("image_url") or ""),
-        }
-
-    if last_error:
-        _LOGGER.info("sql_recommend: no pick after %d attempts (last_error=%s)", len(attempts), last_error)
-    else:
-        _LOGGER.info("sql_recommend: 0 candidates across %d attempts", len(attempts))
-    return None
+async def recommend_from_db_async(
+    tags: Sequence[str],
+    *,
+    use_profile: bool = False,
+    profile_path: str = "backend/data/profile.json",
+    decay_days: float = 90.0,
+    w_tag: float = 0.7,
+    w_recency: float = 0.3,
+    user_id: Optional[str] = None,
+) -> Optional[Dict[str, Any]]:
+    """recommend_from_db for async callers: same query and result, awaited on the AsyncConnectionPool."""
+    params = _request_params(
+        tags, use_profile=use_profile, profile_path=profile_path,
+        decay_days=decay_days, w_tag=w_tag, w_recency=w_recency, user_id=user_id,
+    )
+    if params is None:
+        return None
+    try:
+        candidates = await _fetch_candidates_async(params)
+    except Exception as e:
+        _LOGGER.warning("sql_recommend: fetch failed: %s", e)
+        return None
+    return _pick(candidates)
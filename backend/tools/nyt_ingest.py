@@ -15,18 +15,21 @@ Defaults (from prompt):
 from __future__ import annotations
 
 import argparse
+import hashlib
 import json
 import os
+import sqlite3
 import time
-from typing import Any, Dict, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 import requests
 import psycopg
 from psycopg.rows import dict_row
+from psycopg.types.json import Jsonb
 import getpass
 import yaml
 import numpy as np
-from math import isfinite
 
 # Reuse project embedder when available; otherwise fall back to local SentenceTransformer
 try:
@@ -34,8 +37,19 @@ try:
 except Exception:
     Embedder = None  # Will fallback to local embedder below
 
+# Optional int8 dot-product kernel for T1_INT8; plain NumPy int32 matmul otherwise
+try:
+    import simsimd  # type: ignore
+except Exception:
+    simsimd = None  # type: ignore[assignment]
+
 
 NYT_ENDPOINT = "https://api.nytimes.com/svc/search/v2/articlesearch.json"
+# NYT Article Search allows ~10 requests/min
+RATE_LIMIT_SECONDS = 6.0
+# Shared keep-alive session: one TCP+TLS handshake to the API for the whole run
+# (only the single prefetch worker uses it, so no cross-thread sharing)
+_SESSION = requests.Session()
 
 # T1 tagging config
 ALPHA_PARENT_SMOOTH = float(os.getenv("T1_ALPHA", "0.08"))
@@ -43,11 +57,35 @@ TEMP_SOFTMAX = float(os.getenv("T1_TEMP", "0.08"))
 TOPK_INSIDE = int(os.getenv("T1_TOPK_INSIDE", "3"))
 TOPK_OUTSIDE = int(os.getenv("T1_TOPK_OUTSIDE", "2"))
 MODEL_KEY = os.getenv("MODEL_KEY", "minilm")
+ENCODE_BATCH_SIZE = int(os.getenv("T1_ENCODE_BATCH", "32"))
+# Intra-op threads for the torch forward pass; defaults to the CPUs this process may run on
+TORCH_NUM_THREADS = int(os.getenv("TORCH_NUM_THREADS", "0"))
+# Score articles against an int8-quantized T1 bank (per-row scales; small score drift vs float32)
+T1_INT8 = os.getenv("T1_INT8", "0").lower() in {"1", "true", "yes"}
+# Local fallback embedder: ONNX Runtime with dynamic int8 quantization (needs optimum[onnxruntime])
+ONNX_INT8 = os.getenv("T1_ONNX_INT8", "0").lower() in {"1", "true", "yes"}
+# Where the exported + quantized ONNX model is kept between runs
+CACHE_DIR = os.getenv("CACHE_DIR", os.path.join("backend", "out"))
+# Persist article vectors (title + abstract) in CACHE_DIR so re-runs over overlapping dates skip re-encoding
+EMB_CACHE = os.getenv("T1_EMB_CACHE", "1").lower() in {"1", "true", "yes"}
+# Least recently used rows beyond this are pruned when the cache opens
+EMB_CACHE_MAX = int(os.getenv("T1_EMB_CACHE_MAX", "200000"))
+# Re-score articles whose stored T1 labels are already current (otherwise reruns skip them)
+T1_RESCORE = os.getenv("T1_RESCORE", "0").lower() in {"1", "true", "yes"}
 TAXONOMY_PATH = os.getenv("TAXONOMY_PATH", os.path.join("backend", "taxonomies", "taxonomy.json"))
 
 _T1_BANK: List[Dict[str, Any]] = []
 _T1_EMBS: Optional[np.ndarray] = None
+# _t1_bank_fingerprint(_T1_BANK), part of every stored T1 method string
+_T1_BANK_FP = ""
+# Built with _T1_EMBS: parent T0 (en) per T1 row, and a boolean row mask per parent
+_T1_PARENTS: Optional[np.ndarray] = None
+_PARENT_MASKS: Dict[str, np.ndarray] = {}
+# int8 copy of _T1_EMBS + per-row scales, only built when T1_INT8 is on
+_T1_EMBS_Q: Optional[np.ndarray] = None
+_T1_SCALES: Optional[np.ndarray] = None
 _EMBEDDER: Optional[Any] = None
+_EMB_DB: Optional[sqlite3.Connection] = None
 
 
 def build_fq(section: str, min_word_count: int) -> str:
@@ -77,7 +115,7 @@ def fetch_page(api_key: str, page: int, fq: str, begin: Optional[str], end: Opti
 
     backoff = 2.0
     while True:
-        r = requests.get(NYT_ENDPOINT, params=params, timeout=20)
+        r = _SESSION.get(NYT_ENDPOINT, params=params, timeout=20)
         if r.status_code == 429:
             time.sleep(backoff)
             backoff = min(backoff * 2.0, 64.0)
@@ -86,6 +124,34 @@ def fetch_page(api_key: str, page: int, fq: str, begin: Optional[str], end: Opti
         return r.json()
 
 
+def _image_candidates(m: Any) -> List[Tuple[Optional[str], int]]:
+    """(url, width) pairs from one multimedia entry; handles multiple shapes, including string URLs."""
+    if isinstance(m, str):
+        # Direct URL string (no width info)
+        return [(m, 0)]
+    if not isinstance(m, dict):
+        return []
+    # Old shape
+    out: List[Tuple[Optional[str], int]] = []
+    if m.get("url"):
+        out.append((m["url"], int(m.get("width") or 0)))
+    # New 2025 shape with crops
+    for img in (m.get("default"), m.get("thumbnail") or m.get("thumbail")):
+        if isinstance(img, dict):
+            out.append((img.get("url"), int(img.get("width") or 0)))
+    return out
+
+
+def _fetch_page_not_before(
+    not_before: float, api_key: str, page: int, fq: str, begin: Optional[str], end: Optional[str]
+) -> Dict[str, Any]:
+    """fetch_page, but not before time.monotonic() reaches `not_before` (keeps the NYT rate limit)."""
+    wait = not_before - time.monotonic()
+    if wait > 0:
+        time.sleep(wait)
+    return fetch_page(api_key, page, fq, begin, end)
+
+
 def _pick_image_url(multimedia: Any) -> Optional[str]:
     if not multimedia:
         return None
@@ -96,38 +162,12 @@ def _pick_image_url(multimedia: Any) -> Optional[str]:
         items = multimedia
     else:
         return None
-    # Choose the largest width image; handle multiple shapes, including string URLs
-    best: Optional[str] = None
-    best_w = -1
-    for m in items:
-        candidates: List[Tuple[Optional[str], int]] = []
-        if isinstance(m, str):
-            # Direct URL string (no width info)
-            candidates.append((m, 0))
-        elif isinstance(m, dict):
-            # Old shape
-            url = m.get("url")
-            width = int(m.get("width") or 0)
-            if url:
-                candidates.append((url, width))
-            # New 2025 shape with crops
-            default_img = m.get("default") or {}
-            if isinstance(default_img, dict):
-                candidates.append((default_img.get("url"), int(default_img.get("width") or 0)))
-            thumb_img = m.get("thumbnail") or m.get("thumbail") or {}
-            if isinstance(thumb_img, dict):
-                candidates.append((thumb_img.get("url"), int(thumb_img.get("width") or 0)))
-        else:
-            continue
-
-        for cu, cw in candidates:
-            if not cu:
-                continue
-            if cw > best_w:
-                best_w = cw
-                best = cu
-            # If widths are equal or unknown, keep the first seen
-
+    # Choose the largest width image; max() keeps the first seen when widths are equal or unknown
+    best, _ = max(
+        ((cu, cw) for m in items for cu, cw in _image_candidates(m) if cu and cw > -1),
+        key=lambda c: c[1],
+        default=(None, -1),
+    )
     if not best:
         return None
     if best.startswith("http"):
@@ -258,6 +298,7 @@ def _ensure_extensions_and_table(conn: psycopg.Connection) -> None:
       article_id UUID REFERENCES articles(id) ON DELETE CASCADE,
       level TEXT CHECK (level IN ('T0','T1')),
       tag TEXT NOT NULL,
+      tag_lower TEXT GENERATED ALWAYS AS (lower(tag)) STORED,
       parent_t0 TEXT,
       score DOUBLE PRECISION NOT NULL,
       method TEXT NOT NULL,
@@ -265,42 +306,77 @@ def _ensure_extensions_and_table(conn: psycopg.Connection) -> None:
       PRIMARY KEY (article_id, level, tag)
     );
     """
+    # Serves the SQL recommender's T1 tag lookup (see backend/migrations/002_article_labels_tag_lower.sql)
+    add_tag_lower_sql = """
+    ALTER TABLE article_labels
+      ADD COLUMN IF NOT EXISTS tag_lower TEXT GENERATED ALWAYS AS (lower(tag)) STORED;
+    """
+    create_labels_index_sql = """
+    CREATE INDEX IF NOT EXISTS article_labels_t1_tag_lower
+      ON article_labels (tag_lower, article_id) INCLUDE (score)
+      WHERE level = 'T1';
+    """
+    # Read by the SQL recommender with SQL_PROFILE_SOURCE=db (see backend/migrations/003_user_profiles.sql)
+    create_user_profiles_sql = """
+    CREATE TABLE IF NOT EXISTS user_profiles (
+      user_id TEXT PRIMARY KEY,
+      t1_ranked JSONB NOT NULL DEFAULT '[]'::jsonb,
+      updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+    );
+    """
     with conn.cursor() as cur:
         cur.execute(create_labels_sql)
+        cur.execute(add_tag_lower_sql)
+        cur.execute(create_labels_index_sql)
+        cur.execute(create_user_profiles_sql)
         conn.commit()
 
 
-def upsert_article(conn: psycopg.Connection, a: Dict[str, Any]) -> str:
-    sql = """
-    INSERT INTO articles (
-      nyt_id, web_url, title, abstract, byline, author_list, pub_date, section_name,
-      news_desk, word_count, image_url, source_tags, t0_tag, raw
-    ) VALUES (
-      %(nyt_id)s, %(web_url)s, %(title)s, %(abstract)s, %(byline)s, %(author_list)s::jsonb,
-      %(pub_date)s, %(section_name)s, %(news_desk)s, %(word_count)s, %(image_url)s,
-      %(source_tags)s::jsonb, %(t0_tag)s, %(raw)s::jsonb
-    )
-    ON CONFLICT (nyt_id) DO UPDATE SET
-      web_url = EXCLUDED.web_url,
-      title = EXCLUDED.title,
-      abstract = EXCLUDED.abstract,
-      byline = EXCLUDED.byline,
-      author_list = EXCLUDED.author_list,
-      pub_date = EXCLUDED.pub_date,
-      section_name = EXCLUDED.section_name,
-      news_desk = EXCLUDED.news_desk,
-      word_count = EXCLUDED.word_count,
-      image_url = EXCLUDED.image_url,
-      source_tags = EXCLUDED.source_tags,
-      t0_tag = EXCLUDED.t0_tag,
-      raw = EXCLUDED.raw,
-      updated_at = NOW()
-    RETURNING id;
+_ARTICLE_COLS = (
+    "nyt_id", "web_url", "title", "abstract", "byline", "author_list", "pub_date", "section_name",
+    "news_desk", "word_count", "image_url", "source_tags", "t0_tag", "raw",
+)
+
+
+def bulk_upsert_articles(conn: psycopg.Connection, rows: List[Dict[str, Any]]) -> Dict[str, str]:
+    """Upsert a page of parsed articles via COPY into a temp staging table; returns {nyt_id: article id}.
+
+    JSONB fields are passed as Jsonb. Duplicate nyt_ids within `rows` resolve to the last
+    occurrence, as if each row were upserted in turn.
     """
+    if not rows:
+        return {}
+    cols = ", ".join(_ARTICLE_COLS)
+    updates = ",\n      ".join(f"{c} = EXCLUDED.{c}" for c in _ARTICLE_COLS if c != "nyt_id")
     with conn.cursor() as cur:
-        cur.execute(sql, a)
-        row = cur.fetchone()
-        return str(row["id"]) if isinstance(row, dict) else str(row[0])
+        # Pipelined: both setup statements go out in one round-trip (COPY itself cannot run in pipeline mode)
+        with conn.pipeline():
+            # ON COMMIT DROP: the staging table lives only for this page's transaction
+            cur.execute(
+                "CREATE TEMP TABLE IF NOT EXISTS staging_articles "
+                "(LIKE articles INCLUDING DEFAULTS, seq INTEGER) ON COMMIT DROP"
+            )
+            cur.execute("TRUNCATE staging_articles")
+        with cur.copy(f"COPY staging_articles ({cols}, seq) FROM STDIN") as cp:
+            for seq, r in enumerate(rows):
+                cp.write_row([r.get(c) for c in _ARTICLE_COLS] + [seq])
+        cur.execute(f"""
+    INSERT INTO articles ({cols})
+    SELECT DISTINCT ON (nyt_id) {cols}
+    FROM staging_articles
+    ORDER BY nyt_id, seq DESC
+    ON CONFLICT (nyt_id) DO UPDATE SET
+      {updates},
+      updated_at = NOW()
+    RETURNING id, nyt_id;
+    """, prepare=True)
+        out: Dict[str, str] = {}
+        for row in cur.fetchall():
+            if isinstance(row, dict):
+                out[row["nyt_id"]] = str(row["id"])
+            else:
+                out[row[1]] = str(row[0])
+        return out
 
 
 def _load_taxonomy(path: str) -> Dict[str, Any]:
@@ -342,19 +418,41 @@ def _build_t1_bank(tax: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], Dict[str,
     return t1_bank, t0_by_key
 
 
+def _configure_torch_threads() -> None:
+    # The ingest encodes in one thread, so give torch all usable cores for intra-op work and none for inter-op
+    os.environ.setdefault("TOKENIZERS_PARALLELISM", "true")
+    try:
+        import torch
+    except Exception:
+        return
+    n = TORCH_NUM_THREADS
+    if n <= 0:
+        try:
+            n = len(os.sched_getaffinity(0))
+        except AttributeError:
+            n = os.cpu_count() or 4
+    torch.set_num_threads(n)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        # Only allowed before any inter-op parallel work has started
+        pass
+
+
 def _ensure_embedder() -> Any:
     global _EMBEDDER
     if _EMBEDDER is None:
+        _configure_torch_threads()
         if Embedder is not None:
             _EMBEDDER = Embedder(name=MODEL_KEY)
         else:
             # Local fallback without importing backend module
             try:
                 from sentence_transformers import SentenceTransformer
+                st_error: Optional[Exception] = None
             except Exception as e:
-                raise RuntimeError(
-                    "SentenceTransformer not available. Run 'pip install -r requirements.txt' from repo root."
-                ) from e
+                SentenceTransformer = None  # type: ignore[assignment,misc]
+                st_error = e
 
             EMBEDDER_MAP = {
                 "minilm": "sentence-transformers/all-MiniLM-L6-v2",
@@ -366,97 +464,334 @@ def _ensure_embedder() -> Any:
                 "muse": "sentence-transformers/distiluse-base-multilingual-cased-v2",
             }
             model_name = EMBEDDER_MAP.get(MODEL_KEY, MODEL_KEY)
+            # max_seq_length from each model's sentence_bert_config.json (used if it cannot be read)
+            ST_MAX_SEQ_LENGTH = {
+                "sentence-transformers/all-MiniLM-L6-v2": 256,
+                "sentence-transformers/all-mpnet-base-v2": 384,
+                "intfloat/e5-base-v2": 512,
+                "intfloat/multilingual-e5-base": 512,
+                "intfloat/multilingual-e5-large": 512,
+                "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2": 128,
+                "sentence-transformers/distiluse-base-multilingual-cased-v2": 128,
+            }
 
             class _LocalEmbedder:
                 def __init__(self, model_name: str):
                     self.model = SentenceTransformer(model_name)
 
                 def encode(self, texts: List[str]):
+                    # SentenceTransformer.encode already length-sorts texts into mini-batches (and restores
+                    # input order), so padding stays minimal; only the batch size needs to be explicit.
                     return self.model.encode(
                         texts,
+                        batch_size=ENCODE_BATCH_SIZE,
                         normalize_embeddings=True,
                         convert_to_numpy=True,
                         show_progress_bar=False,
                     )
 
-            _EMBEDDER = _LocalEmbedder(model_name)
+            class _OnnxInt8Embedder:
+                """Mean-pooled, L2-normalized embeddings from a dynamically int8-quantized ONNX export.
+
+                Matches SentenceTransformer for the mean-pooling models (minilm, mpnet, e5 variants);
+                models with extra dense layers (muse) should stay on the PyTorch path.
+                """
+
+                def __init__(self, model_name: str):
+                    from optimum.onnxruntime import ORTModelForFeatureExtraction, ORTQuantizer
+                    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+                    from transformers import AutoTokenizer
+
+                    out_dir = os.path.join(CACHE_DIR, model_name.replace("/", "__") + "-int8")
+                    file_name = "model_quantized.onnx"
+                    if not os.path.exists(os.path.join(out_dir, file_name)):
+                        # One-time export + quantization; later runs load straight from out_dir
+                        fp32 = ORTModelForFeatureExtraction.from_pretrained(model_name, export=True)
+                        qconfig = AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+                        ORTQuantizer.from_pretrained(fp32).quantize(save_dir=out_dir, quantization_config=qconfig)
+                        AutoTokenizer.from_pretrained(model_name).save_pretrained(out_dir)
+                    self.model = ORTModelForFeatureExtraction.from_pretrained(out_dir, file_name=file_name)
+                    self.tokenizer = AutoTokenizer.from_pretrained(out_dir)
+                    self.max_length = self._max_seq_length(model_name)
+
+                @staticmethod
+                def _max_seq_length(model_name: str) -> int:
+                    # SentenceTransformer truncates at max_seq_length from sentence_bert_config.json,
+                    # not at the tokenizer's model_max_length (512), so long texts must be cut the same way
+                    try:
+                        if os.path.isdir(model_name):
+                            cfg_path = os.path.join(model_name, "sentence_bert_config.json")
+                        else:
+                            from huggingface_hub import hf_hub_download
+
+                            cfg_path = hf_hub_download(model_name, "sentence_bert_config.json")
+                        with open(cfg_path, "r", encoding="utf-8") as f:
+                            n = json.load(f).get("max_seq_length")
+                        if n:
+                            return int(n)
+                    except Exception:
+                        pass
+                    return ST_MAX_SEQ_LENGTH.get(model_name, 256)
+
+                def encode(self, texts: List[str]):
+                    out = np.zeros((len(texts), 0), dtype=np.float32)
+                    # Length-sorted mini-batches keep padding minimal, like SentenceTransformer.encode
+                    order = sorted(range(len(texts)), key=lambda i: -len(texts[i]))
+                    for start in range(0, len(order), ENCODE_BATCH_SIZE):
+                        idx = order[start:start + ENCODE_BATCH_SIZE]
+                        enc = self.tokenizer(
+                            [texts[i] for i in idx], padding=True, truncation=True,
+                            max_length=self.max_length, return_tensors="np",
+                        )
+                        hidden = np.asarray(self.model(**enc).last_hidden_state, dtype=np.float32)
+                        m = enc["attention_mask"][..., None].astype(np.float32)
+                        pooled = (hidden * m).sum(axis=1) / np.maximum(m.sum(axis=1), 1e-9)
+                        pooled /= np.linalg.norm(pooled, axis=1, keepdims=True).clip(min=1e-9)
+                        if out.shape[1] == 0:
+                            out = np.zeros((len(texts), pooled.shape[1]), dtype=np.float32)
+                        out[idx] = pooled
+                    return out
+
+            if ONNX_INT8:
+                # No silent fallback: _embed_backend() labels caches and stored label methods from the flag,
+                # so the flag must always mean the ONNX embedder is the one in use
+                try:
+                    _EMBEDDER = _OnnxInt8Embedder(model_name)
+                except Exception as e:
+                    raise RuntimeError(
+                        "T1_ONNX_INT8=1 but the ONNX int8 embedder could not be built; "
+                        "install optimum[onnxruntime] or unset T1_ONNX_INT8."
+                    ) from e
+            else:
+                if SentenceTransformer is None:
+                    raise RuntimeError(
+                        "SentenceTransformer not available. Run 'pip install -r requirements.txt' from repo root."
+                    ) from st_error
+                _EMBEDDER = _LocalEmbedder(model_name)
     return _EMBEDDER
 
 
+def _quantize_rows(X: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Symmetric per-row int8 quantization: X ≈ X_q / scale[:, None]."""
+    amax = np.abs(X).max(axis=1) if X.size else np.zeros(X.shape[0], dtype=np.float32)
+    scale = (127.0 / np.maximum(amax, 1e-12)).astype(np.float32)
+    return np.round(X * scale[:, None]).astype(np.int8), scale
+
+
+def _t1_sims(V: np.ndarray) -> np.ndarray:
+    """Cosine sims (N, K) of unit article rows vs _T1_EMBS; int8 path when T1_INT8 built the quantized bank."""
+    if _T1_EMBS_Q is None or _T1_SCALES is None:
+        return V @ _T1_EMBS.T
+    V_q, V_scale = _quantize_rows(V)
+    if simsimd is not None:
+        dots = np.asarray(simsimd.cdist(V_q, _T1_EMBS_Q, metric="dot"), dtype=np.float32)
+    else:
+        dots = (V_q.astype(np.int32) @ _T1_EMBS_Q.astype(np.int32).T).astype(np.float32)
+    return dots / (V_scale[:, None] * _T1_SCALES[None, :])
+
+
+def _embed_backend() -> str:
+    # T1_ONNX_INT8 only applies to the local fallback (no backend.src.models)
+    return "onnx-int8" if ONNX_INT8 and Embedder is None else "st"
+
+
+def _t1_bank_fingerprint(bank: List[Dict[str, Any]]) -> str:
+    # Everything about the bank that T1 picks depend on: ids, parents and the embedded label texts
+    h = hashlib.blake2b(digest_size=8)
+    for t in bank:
+        h.update("\x1f".join((t["t1_id"], t["parent_t0_id"], t["parent_t0_en"], t["label_text"])).encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def _t1_cache_path(texts: List[str]) -> str:
+    # Keyed on model + backend + the exact label texts, so any taxonomy edit gets a fresh file
+    h = hashlib.blake2b(digest_size=8)
+    for t in texts:
+        h.update(t.encode("utf-8") + b"\0")
+    return os.path.join(CACHE_DIR, f"t1_{MODEL_KEY.replace('/', '__')}_{_embed_backend()}_{h.hexdigest()}.npy")
+
+
 def _ensure_t1_embeddings() -> None:
-    global _T1_BANK, _T1_EMBS
+    global _T1_BANK, _T1_BANK_FP, _T1_EMBS, _T1_PARENTS, _PARENT_MASKS, _T1_EMBS_Q, _T1_SCALES
     if _T1_EMBS is not None and _T1_BANK:
         return
+    _T1_EMBS = None
     tax = _load_taxonomy(TAXONOMY_PATH)
     _T1_BANK, _ = _build_t1_bank(tax)
-    emb = _ensure_embedder()
+    _T1_BANK_FP = _t1_bank_fingerprint(_T1_BANK)
+    _T1_PARENTS = np.array([t["parent_t0_en"] for t in _T1_BANK])
+    _PARENT_MASKS = {en: (_T1_PARENTS == en) for en in set(_T1_PARENTS.tolist())}
     texts = [t["label_text"] for t in _T1_BANK]
     if not texts:
         _T1_EMBS = np.zeros((0, 384), dtype=np.float32)
         return
-    embs = emb.encode(texts)
-    _T1_EMBS = embs.astype(np.float32)
-
-
-def _normalize(v: np.ndarray, eps: float = 1e-9) -> np.ndarray:
-    n = float(np.linalg.norm(v))
-    if not isfinite(n) or n <= eps:
-        return v
-    return v / n
-
-
-def _article_vec(title: Optional[str], abstract: Optional[str]) -> np.ndarray:
-    emb = _ensure_embedder()
-    title = (title or "").strip()
-    abstract = (abstract or "").strip()
-    if title and abstract:
-        tv, av = emb.encode([title, abstract])
-        vec = 0.7 * tv + 0.3 * av
-    elif title:
-        vec = emb.encode([title])[0]
-    elif abstract:
-        vec = emb.encode([abstract])[0]
-    else:
-        vec = np.zeros((_T1_EMBS.shape[1] if _T1_EMBS is not None and _T1_EMBS.size else 384,), dtype=np.float32)
-    return _normalize(vec.astype(np.float32))
-
-
-def _softmax(x: np.ndarray, temp: float) -> np.ndarray:
-    if x.size == 0:
-        return x
-    z = (x / max(temp, 1e-6)).astype(np.float64)
-    z -= z.max()
-    exp = np.exp(z)
-    return (exp / (exp.sum() + 1e-12)).astype(np.float32)
-
-
-def _compute_t1_scores_for_article(title: str, abstract: Optional[str], chosen_t0: Dict[str, Any]) -> List[Dict[str, Any]]:
-    _ensure_t1_embeddings()
-    if _T1_EMBS is None or _T1_EMBS.size == 0:
-        return []
-    v = _article_vec(title, abstract)
-    # cos sims since both normalized
-    sims = _T1_EMBS @ v
-    parents = np.array([t["parent_t0_en"] for t in _T1_BANK])
-    chosen_t0_en = chosen_t0.get("en")
-    sims = sims + ALPHA_PARENT_SMOOTH * (parents == chosen_t0_en)
-    s = _softmax(sims, TEMP_SOFTMAX)
-    # min-max to [0,1]
-    s_min, s_max = float(s.min(initial=0.0)), float(s.max(initial=1.0))
-    s = (s - s_min) / (max(s_max - s_min, 1e-6))
-
-    # Rank indices
-    idx_sorted = np.argsort(-s)
-    inside_idxs = [i for i in idx_sorted if _T1_BANK[i]["parent_t0_en"] == chosen_t0_en]
-    outside_idxs = [i for i in idx_sorted if _T1_BANK[i]["parent_t0_en"] != chosen_t0_en]
-
-    # Pick top inside
-    top_in = inside_idxs[:TOPK_INSIDE]
-
+    path = _t1_cache_path(texts)
+    if os.path.exists(path):
+        try:
+            cached = np.load(path, mmap_mode="r")
+            if cached.ndim == 2 and cached.shape[0] == len(texts) and cached.dtype == np.float32:
+                _T1_EMBS = cached
+        except Exception:
+            pass
+    if _T1_EMBS is None:
+        embs = np.asarray(_ensure_embedder().encode(texts), dtype=np.float32)
+        # Unit rows so _T1_EMBS @ v is a true cosine whatever the embedder returns
+        embs /= np.linalg.norm(embs, axis=1, keepdims=True).clip(min=1e-9)
+        _T1_EMBS = np.ascontiguousarray(embs)
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                np.save(f, _T1_EMBS)
+            os.replace(tmp, path)
+        except Exception:
+            pass
+    if T1_INT8:
+        _T1_EMBS_Q, _T1_SCALES = _quantize_rows(_T1_EMBS)
+
+
+def _parent_mask(chosen_t0_en: Optional[str]) -> np.ndarray:
+    mask = _PARENT_MASKS.get(chosen_t0_en) if chosen_t0_en is not None else None
+    return mask if mask is not None else np.zeros(len(_T1_BANK), dtype=bool)
+
+
+def _emb_db() -> sqlite3.Connection:
+    global _EMB_DB
+    if _EMB_DB is None:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        conn = sqlite3.connect(os.path.join(CACHE_DIR, "ingest_emb_cache.sqlite3"))
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("CREATE TABLE IF NOT EXISTS emb_cache (k TEXT PRIMARY KEY, v BLOB NOT NULL, ts INTEGER NOT NULL)")
+        conn.execute(
+            "DELETE FROM emb_cache WHERE k IN (SELECT k FROM emb_cache ORDER BY ts DESC LIMIT -1 OFFSET ?)",
+            (EMB_CACHE_MAX,),
+        )
+        conn.commit()
+        _EMB_DB = conn
+    return _EMB_DB
+
+
+def _emb_key(title: str, abstract: str) -> str:
+    # Namespaced by model + backend so switching either never serves stale vectors
+    ns = f"{MODEL_KEY}:{_embed_backend()}"
+    return hashlib.blake2b(f"{ns}\n{title}\u241e{abstract}".encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _article_vecs(docs: List[Tuple[Optional[str], Optional[str]]]) -> np.ndarray:
+    """L2-normalized 0.7*title + 0.3*abstract vectors for (title, abstract) pairs; only uncached pairs are encoded."""
+    dim = _T1_EMBS.shape[1] if _T1_EMBS is not None and _T1_EMBS.size else 384
+    pairs = [((t or "").strip(), (a or "").strip()) for t, a in docs]
+    if not EMB_CACHE:
+        return _encode_pairs(pairs, dim)
+    V = np.zeros((len(pairs), dim), dtype=np.float32)
+    keys = [_emb_key(t, a) if (t or a) else None for t, a in pairs]
+    wanted = sorted({k for k in keys if k is not None})
+    if not wanted:
+        return V
+    hits: Dict[str, np.ndarray] = {}
+    try:
+        db = _emb_db()
+        for start in range(0, len(wanted), 500):
+            chunk = wanted[start:start + 500]
+            q = f"SELECT k, v FROM emb_cache WHERE k IN ({', '.join('?' * len(chunk))})"
+            for k, v in db.execute(q, chunk):
+                vec = np.frombuffer(v, dtype=np.float32)
+                if vec.shape[0] == dim:
+                    hits[k] = vec
+        if hits:
+            # Touch hit rows so pruning evicts by last use, not by insertion
+            now = int(time.time())
+            db.executemany("UPDATE emb_cache SET ts = ? WHERE k = ?", [(now, k) for k in hits])
+            db.commit()
+    except Exception:
+        pass
+    # Encode each missing pair once, even when a page repeats it
+    miss_pairs: Dict[str, Tuple[str, str]] = {}
+    for k, pair in zip(keys, pairs):
+        if k is not None and k not in hits and k not in miss_pairs:
+            miss_pairs[k] = pair
+    if miss_pairs:
+        E = _encode_pairs(list(miss_pairs.values()), dim)
+        fresh = dict(zip(miss_pairs.keys(), E))
+        hits.update(fresh)
+        try:
+            now = int(time.time())
+            db = _emb_db()
+            db.executemany(
+                "INSERT OR REPLACE INTO emb_cache (k, v, ts) VALUES (?, ?, ?)",
+                [(k, v.astype(np.float32).tobytes(), now) for k, v in fresh.items()],
+            )
+            db.commit()
+        except Exception:
+            pass
+    for i, k in enumerate(keys):
+        if k is not None:
+            V[i] = hits[k]
+    return V
+
+
+def _encode_pairs(pairs: List[Tuple[str, str]], dim: int) -> np.ndarray:
+    """Vectors for already-stripped (title, abstract) pairs, one encode call for all."""
+    texts: List[str] = []
+    t_idx: List[int] = []
+    a_idx: List[int] = []
+    for t, a in pairs:
+        t_idx.append(len(texts) if t else -1)
+        if t:
+            texts.append(t)
+        a_idx.append(len(texts) if a else -1)
+        if a:
+            texts.append(a)
+    V = np.zeros((len(pairs), dim), dtype=np.float32)
+    if not texts:
+        return V
+    E = np.asarray(_ensure_embedder().encode(texts), dtype=np.float32)
+    ti = np.asarray(t_idx)
+    ai = np.asarray(a_idx)
+    both = (ti >= 0) & (ai >= 0)
+    only_t = (ti >= 0) & (ai < 0)
+    only_a = (ti < 0) & (ai >= 0)
+    V[both] = 0.7 * E[ti[both]] + 0.3 * E[ai[both]]
+    V[only_t] = E[ti[only_t]]
+    V[only_a] = E[ai[only_a]]
+    # Leave zero / non-finite rows untouched (e.g. docs with neither title nor abstract)
+    n = np.linalg.norm(V, axis=1)
+    ok = np.isfinite(n) & (n > 1e-9)
+    V[ok] /= n[ok, None]
+    return V
+
+
+def _score_rows(sims_all: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """Per-row softmax(sims + alpha*parent_mask, temp), min-max scaled with the range seeded at [0, 1]."""
+    # Whole (N, K) page at once, in place and in float32 (only the row sums accumulate in float64)
+    alpha = np.float32(ALPHA_PARENT_SMOOTH)
+    inv_temp = np.float32(1.0 / max(TEMP_SOFTMAX, 1e-6))
+    z = (np.asarray(sims_all, dtype=np.float32) + alpha * mask) * inv_temp
+    z -= z.max(axis=1, keepdims=True)
+    s = np.exp(z, out=z)
+    s /= (s.sum(axis=1, keepdims=True, dtype=np.float64) + 1e-12).astype(np.float32)
+    lo = np.minimum(s.min(axis=1, keepdims=True), np.float32(0.0))
+    hi = np.maximum(s.max(axis=1, keepdims=True), np.float32(1.0))
+    s -= lo
+    s /= np.maximum(hi - lo, np.float32(1e-6))
+    return s
+
+
+def _top_sorted(s: np.ndarray, idx: np.ndarray, k: int) -> np.ndarray:
+    """The (at most) k entries of `idx` with the highest s, best first; argpartition instead of a full sort."""
+    if k <= 0 or idx.size == 0:
+        return idx[:0]
+    if idx.size > k:
+        idx = idx[np.argpartition(-s[idx], k - 1)[:k]]
+    return idx[np.argsort(-s[idx])]
+
+
+def _pick_outside(ranked: List[int]) -> List[int]:
     # Pick top outside with distinct parents if possible
     top_out: List[int] = []
     used_parents: set[str] = set()
-    for i in outside_idxs:
+    for i in ranked:
         p = _T1_BANK[i]["parent_t0_en"]
         if p in used_parents and len(used_parents) < TOPK_OUTSIDE:
             # try to diversify first
@@ -465,6 +800,35 @@ def _compute_t1_scores_for_article(title: str, abstract: Optional[str], chosen_t
         used_parents.add(p)
         if len(top_out) >= TOPK_OUTSIDE:
             break
+    return top_out
+
+
+def _t1_method() -> str:
+    # Stored on every T1 label, and scored_nyt_ids only keeps labels whose method matches: so it names
+    # everything that changes the picks (bank contents, top-k, embedder backend, int8 scoring)
+    return (
+        f"embed+smooth:{MODEL_KEY}:alpha={ALPHA_PARENT_SMOOTH}:temp={TEMP_SOFTMAX}"
+        f":k={TOPK_INSIDE}+{TOPK_OUTSIDE}:bank={_T1_BANK_FP}:{_embed_backend()}{':int8' if T1_INT8 else ''}"
+    )
+
+
+def _t1_picks(s: np.ndarray, inside_mask: np.ndarray) -> List[Dict[str, Any]]:
+    # Split by the chosen T0's cached parent mask, then rank only the few entries each side needs
+    inside = np.flatnonzero(inside_mask)
+    outside = np.flatnonzero(~inside_mask)
+
+    # Pick top inside
+    top_in = _top_sorted(s, inside, TOPK_INSIDE).tolist()
+
+    # The diversity pass may skip same-parent entries, so rank a slack window and widen it only if
+    # the pass runs off the end of the window before filling TOPK_OUTSIDE
+    k = TOPK_OUTSIDE + 8
+    while True:
+        outside_idxs = _top_sorted(s, outside, k).tolist()
+        top_out = _pick_outside(outside_idxs)
+        if len(top_out) >= TOPK_OUTSIDE or len(outside_idxs) >= outside.size:
+            break
+        k *= 4
     if len(top_out) < TOPK_OUTSIDE:
         # fill remaining from outside regardless of parent diversity
         for i in outside_idxs:
@@ -481,43 +845,127 @@ def _compute_t1_scores_for_article(title: str, abstract: Optional[str], chosen_t
             "tag": t["t1_id"],
             "parent_t0": t["parent_t0_id"],
             "score": float(s[i]),
-            "method": f"embed+smooth:{MODEL_KEY}:alpha={ALPHA_PARENT_SMOOTH}:temp={TEMP_SOFTMAX}",
+            "method": _t1_method(),
         })
     return picks
 
 
+def _compute_t1_scores_batch(
+    docs: List[Tuple[Optional[str], Optional[str]]], chosen_t0: Dict[str, Any]
+) -> List[List[Dict[str, Any]]]:
+    """T1 picks for each (title, abstract) pair; all docs share one encode call and one matmul."""
+    _ensure_t1_embeddings()
+    if _T1_EMBS is None or _T1_EMBS.size == 0:
+        return [[] for _ in docs]
+    if not docs:
+        return []
+    V = _article_vecs(docs)
+    # cos sims since both normalized; (N, K) for all docs on the page at once
+    sims_all = _t1_sims(V)
+    mask = _parent_mask(chosen_t0.get("en"))
+    # Parent bonus, softmax and min-max for all rows together instead of row by row
+    scores = _score_rows(sims_all, mask)
+    return [_t1_picks(s, mask) for s in scores]
+
+
 def _match_t0(t0_key: str, t0_map: Dict[str, Dict[str, Any]]) -> Optional[Dict[str, Any]]:
     if not t0_key:
         return None
     return t0_map.get(t0_key.casefold())
 
 
-def upsert_article_labels(conn: psycopg.Connection, article_id: str, chosen_t0: Dict[str, Any], t1_picks: List[Dict[str, Any]]) -> None:
-    # Upsert T0 anchor
-    sql_t0 = """
+def bulk_upsert_article_labels(
+    conn: psycopg.Connection, items: List[Tuple[str, List[Dict[str, Any]]]], chosen_t0: Dict[str, Any]
+) -> None:
+    """Upsert the T0 anchor + T1 picks for many (article_id, t1_picks) pairs in one multi-row INSERT."""
+    # Keyed on the conflict target so a label repeated in `items` keeps its last value (one row per key
+    # is required: ON CONFLICT DO UPDATE cannot touch the same row twice in a statement)
+    rows: Dict[Tuple[str, str, str], Tuple[Any, ...]] = {}
+    t0_method = f"anchor:{MODEL_KEY}"
+    for article_id, t1_picks in items:
+        rows[(article_id, "T0", chosen_t0["id"])] = (article_id, "T0", chosen_t0["id"], None, 1.0, t0_method)
+        for p in t1_picks:
+            rows[(article_id, "T1", p["tag"])] = (article_id, "T1", p["tag"], p["parent_t0"], p["score"], p["method"])
+    if not rows:
+        return
+    values = ", ".join(["(%s, %s, %s, %s, %s, %s)"] * len(rows))
+    sql = f"""
     INSERT INTO article_labels (article_id, level, tag, parent_t0, score, method)
-    VALUES (%(article_id)s, 'T0', %(tag)s, NULL, %(score)s, %(method)s)
+    VALUES {values}
     ON CONFLICT (article_id, level, tag) DO UPDATE SET
       score = EXCLUDED.score,
       method = EXCLUDED.method;
     """
-    sql_t1 = """
-    INSERT INTO article_labels (article_id, level, tag, parent_t0, score, method)
-    VALUES (%(article_id)s, 'T1', %(tag)s, %(parent_t0)s, %(score)s, %(method)s)
-    ON CONFLICT (article_id, level, tag) DO UPDATE SET
-      score = EXCLUDED.score,
-      method = EXCLUDED.method;
+    with conn.cursor() as cur:
+        # Pages of the same size produce the same statement text, so the prepared plan is reused
+        cur.execute(sql, [v for row in rows.values() for v in row], prepare=True)
+
+
+def scored_nyt_ids(conn: psycopg.Connection, docs: List[Dict[str, Any]]) -> set[str]:
+    """nyt_ids in `docs` whose stored T1 labels are still current, so re-scoring would reproduce them.
+
+    Current means the stored title, abstract and t0_tag (everything T1 scoring reads) match the parsed
+    doc, and the article has T1 labels whose method matches this scoring config and T1 bank.
+    """
+    if T1_RESCORE or not docs:
+        return set()
+    _ensure_t1_embeddings()  # _t1_method() needs the bank fingerprint
+    sql = """
+    SELECT a.nyt_id, a.title, a.abstract, a.t0_tag
+    FROM articles a
+    WHERE a.nyt_id = ANY(%s)
+      AND EXISTS (
+        SELECT 1 FROM article_labels l
+        WHERE l.article_id = a.id AND l.level = 'T1' AND l.method = %s
+      );
     """
     with conn.cursor() as cur:
-        cur.execute(sql_t0, {
-            "article_id": article_id,
-            "tag": chosen_t0["id"],
-            "score": 1.0,
-            "method": f"anchor:{MODEL_KEY}",
-        })
-        for p in t1_picks:
-            params = {"article_id": article_id, **p}
-            cur.execute(sql_t1, params)
+        cur.execute(sql, (list({d["nyt_id"] for d in docs}), _t1_method()), prepare=True)
+        rows = cur.fetchall()
+    stored = {}
+    for row in rows:
+        r = row if isinstance(row, dict) else dict(zip(("nyt_id", "title", "abstract", "t0_tag"), row))
+        stored[r["nyt_id"]] = (r["title"], r["abstract"], r["t0_tag"])
+    # A nyt_id repeated within the page only counts when every copy matches
+    stale = {d["nyt_id"] for d in docs if stored.get(d["nyt_id"]) != (d.get("title"), d.get("abstract"), d.get("t0_tag"))}
+    return set(stored) - stale
+
+
+def iter_parsed_pages(
+    api_key: str, fq: str, t0: str, begin: Optional[str], end: Optional[str], max_pages: int
+) -> Iterator[Tuple[int, List[Dict[str, Any]]]]:
+    """Yield (page, parsed docs) one page at a time; only the current page and one prefetch are held.
+
+    Docs without an id or URL are dropped. Closing the generator cancels a pending prefetch.
+    """
+    # One background fetch at a time: page N+1 downloads (after the rate-limit gap) while page N is consumed
+    fetcher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="nyt_fetch")
+    try:
+        next_fetch = fetcher.submit(fetch_page, api_key, 0, fq, begin, end)
+        fetch_started = time.monotonic()
+        for page in range(max_pages):
+            data = next_fetch.result()
+            if page < max_pages - 1:
+                # Rate limit: <= 10 req/min → start the next request >= ~6s after the previous one
+                not_before = fetch_started + RATE_LIMIT_SECONDS
+                next_fetch = fetcher.submit(_fetch_page_not_before, not_before, api_key, page + 1, fq, begin, end)
+                fetch_started = max(time.monotonic(), not_before)
+            resp = (data or {}).get("response") or {}
+            docs: List[Dict[str, Any]] = resp.get("docs") or []
+            if not isinstance(docs, list):
+                docs = []
+            page_docs: List[Dict[str, Any]] = []
+            for d in docs:
+                parsed = parse_doc(d, t0)
+                # Skip if no id or URL
+                if not parsed.get("nyt_id") or not parsed.get("web_url"):
+                    continue
+                page_docs.append(parsed)
+            # Drop the response envelope before suspending; the parsed docs are all the caller needs
+            del data, resp, docs
+            yield page, page_docs
+    finally:
+        fetcher.shutdown(wait=False, cancel_futures=True)
 
 
 def main() -> None:
@@ -559,36 +1007,35 @@ def main() -> None:
         raise SystemExit(f"Unknown T0 '{args.t0}'. Check taxonomy at {TAXONOMY_PATH}.")
 
     total_upserts = 0
+    pages = iter_parsed_pages(api_key, fq, args.t0, args.begin, args.end, args.max_pages)
     try:
-        for page in range(args.max_pages):
-            data = fetch_page(api_key, page, fq, args.begin, args.end)
-            resp = (data or {}).get("response") or {}
-            docs: List[Dict[str, Any]] = resp.get("docs") or []
-            if not isinstance(docs, list):
-                docs = []
+        for page, page_docs in pages:
             upserts_this_page = 0
-            for d in docs:
-                parsed = parse_doc(d, args.t0)
-                # Skip if no id or URL
-                if not parsed.get("nyt_id") or not parsed.get("web_url"):
-                    continue
-                # JSONB fields must be dumped to JSON text for psycopg binding
-                parsed["author_list"] = json.dumps(parsed.get("author_list") or [])
-                parsed["source_tags"] = json.dumps(parsed.get("source_tags") or [])
-                parsed["raw"] = json.dumps(parsed.get("raw") or {})
-                article_id = upsert_article(conn, parsed)
-                # Compute and upsert labels
-                t1_picks = _compute_t1_scores_for_article(parsed.get("title") or "", parsed.get("abstract"), chosen_t0)
-                upsert_article_labels(conn, article_id, chosen_t0, t1_picks)
-                upserts_this_page += 1
+            # Reruns: articles whose T1 labels are unchanged keep them and skip encoding + scoring
+            skip = scored_nyt_ids(conn, page_docs)
+            to_score = [p for p in page_docs if p["nyt_id"] not in skip]
+            # Score the rest of the page in one batch: one encode call and one matmul instead of per article
+            scored = iter(_compute_t1_scores_batch(
+                [(p.get("title") or "", p.get("abstract")) for p in to_score], chosen_t0
+            ))
+            page_picks = [[] if p["nyt_id"] in skip else next(scored) for p in page_docs]
+            for parsed in page_docs:
+                # Jsonb wrappers bind as jsonb directly (no ::jsonb cast, serialized once by psycopg)
+                parsed["author_list"] = Jsonb(parsed.get("author_list") or [])
+                parsed["source_tags"] = Jsonb(parsed.get("source_tags") or [])
+                parsed["raw"] = Jsonb(parsed.get("raw") or {})
+            # One COPY + INSERT ... SELECT for the page instead of one INSERT round-trip per article
+            article_ids = bulk_upsert_articles(conn, page_docs)
+            # ...and all of the page's labels in one multi-row INSERT
+            bulk_upsert_article_labels(
+                conn, [(article_ids[p["nyt_id"]], picks) for p, picks in zip(page_docs, page_picks)], chosen_t0
+            )
+            upserts_this_page += len(page_docs)
             conn.commit()
             total_upserts += upserts_this_page
             print(f"[page {page}] upserted {upserts_this_page} rows")
-
-            # Rate limit: <= 10 req/min → sleep ~6s between pages
-            if page < args.max_pages - 1:
-                time.sleep(6)
     finally:
+        pages.close()
         conn.close()
 
     print("[done] ingestion completed")
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+profile.json → PostgreSQL user_profiles
+
+Usage (PowerShell):
+  python backend/tools/profile_ingest.py --user-id default --input backend/data/profile.json
+
+Environment:
+  PGHOST, PGPORT, PGDATABASE, PGUSER, PGPASSWORD, PGSSLMODE
+
+The SQL recommender reads t1_ranked from this table when SQL_PROFILE_SOURCE=db (see backend/src/sql_recommend.py).
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+from typing import Any, List
+
+import psycopg
+
+
+CREATE_USER_PROFILES_SQL = """
+CREATE TABLE IF NOT EXISTS user_profiles (
+  user_id TEXT PRIMARY KEY,
+  t1_ranked JSONB NOT NULL DEFAULT '[]'::jsonb,
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+"""
+
+UPSERT_USER_PROFILE_SQL = """
+INSERT INTO user_profiles (user_id, t1_ranked, updated_at)
+VALUES (%(user_id)s, %(t1_ranked)s::jsonb, NOW())
+ON CONFLICT (user_id) DO UPDATE SET
+  t1_ranked = EXCLUDED.t1_ranked,
+  updated_at = NOW();
+"""
+
+
+def _connect() -> psycopg.Connection:
+    host = os.getenv("PGHOST")
+    dbname = os.getenv("PGDATABASE")
+    user = os.getenv("PGUSER")
+    if not host or not dbname or not user:
+        raise SystemExit("Postgres env vars missing (PGHOST, PGDATABASE, PGUSER)")
+    return psycopg.connect(
+        host=host,
+        port=int(os.getenv("PGPORT", "5432")),
+        dbname=dbname,
+        user=user,
+        password=os.getenv("PGPASSWORD", ""),
+        sslmode=os.getenv("PGSSLMODE", "require"),
+    )
+
+
+def _load_t1_ranked(path: str) -> List[Any]:
+    with open(path, "r", encoding="utf-8") as f:
+        prof = json.load(f)
+    ranked = prof.get("t1_ranked") or []
+    # Keep only well-formed [name, count] entries; the recommender reads item[0]
+    return [item for item in ranked if isinstance(item, list) and item and isinstance(item[0], str)]
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Load a profile.json t1_ranked list into PostgreSQL user_profiles")
+    ap.add_argument("--user-id", required=True, help="user_id the /recommend request will send")
+    ap.add_argument("--input", default="backend/data/profile.json", help="Profile JSON (default backend/data/profile.json)")
+    args = ap.parse_args()
+
+    t1_ranked = _load_t1_ranked(args.input)
+    with _connect() as conn:
+        conn.execute(CREATE_USER_PROFILES_SQL)
+        conn.execute(UPSERT_USER_PROFILE_SQL, {"user_id": args.user_id, "t1_ranked": json.dumps(t1_ranked)})
+    print(f"[done] stored {len(t1_ranked)} T1 entries for user '{args.user_id}'")
+
+
+if __name__ == "__main__":
+    main()